@@ -1,6 +1,6 @@
 __all__ = ["ExpressionError", "EmptySubExpressionError",
            "ParenthesisError", "BadEscapedSymbolError",
-           "UnexpectedEndError"]
+           "UnexpectedEndError", "CharClassError", "QuantifierError"]
 
 
 class ExpressionError(Exception):
@@ -22,3 +22,11 @@ class BadEscapedSymbolError(ExpressionError):
 
 class UnexpectedEndError(ExpressionError):
     pass
+
+
+class CharClassError(ExpressionError):
+    pass
+
+
+class QuantifierError(ExpressionError):
+    pass
@@ -1,6 +1,8 @@
+from typing import Dict, Optional
+
 from ast.errors import EmptySubExpressionError, ParenthesisError, ExpressionError
-from ast.scanner import Special, scan
-from ast.tree import Node, Concatenation, Decision, Clini, Value, AST
+from ast.scanner import Special, Quantifier, Ranges, is_symbol, scan
+from ast.tree import Node, Concatenation, Decision, Clini, Repetition, Value, CharClass, Group, AST
 
 __all__ = ["parse"]
 
@@ -10,6 +12,11 @@ def is_spec_symb(token, symb: chr) -> bool:
     return type(token) is Special and token.s == symb
 
 
+def is_postfix(token) -> bool:
+    """Checks is token a postfix operator (`*`, `+`, `?` or `{m,n}`) or not."""
+    return is_spec_symb(token, '*') or type(token) is Quantifier
+
+
 def parenthesis_test(tokens: list) -> bool:
     """Checks do tokens have equal amount of parenthesis or not."""
     parenthesis = 0
@@ -22,6 +29,21 @@ def parenthesis_test(tokens: list) -> bool:
     return parenthesis == 0
 
 
+def is_wrapped(tokens: list) -> bool:
+    """Checks whether the first parenthesis of tokens is closed by the last one."""
+    if not (is_spec_symb(tokens[0], '(') and is_spec_symb(tokens[-1], ')')):
+        return False
+    par = 0
+    for s in tokens[1:-1]:
+        if is_spec_symb(s, '('):
+            par += 1
+        if is_spec_symb(s, ')'):
+            par -= 1
+        if par < 0:
+            return False
+    return par == 0
+
+
 def get_or_op(tokens: list) -> (int, bool):
     """Returns position of `|` symbol that is not in parenthesis."""
     i: int = 0
@@ -45,7 +67,7 @@ def next_op(tokens: list) -> (list, str, list):
     if len(tokens) == 0:
         raise EmptySubExpressionError("Whole expression or its subset in parenthesis is empty.")
     if len(tokens) == 1:
-        if type(tokens[0]) is str:
+        if is_symbol(tokens[0]):
             return tokens, "v", []
         else:
             raise ExpressionError("Subexpression is an operator.")
@@ -67,30 +89,24 @@ def next_op(tokens: list) -> (list, str, list):
             if par == 0:
                 break
         pos = i
-    elif type(tokens[0]) is str:
+    elif is_symbol(tokens[0]):
         pos = 1
 
     for i in range(pos, len(tokens)):
-        if not is_spec_symb(tokens[i], '*'):
+        if not is_postfix(tokens[i]):
             pos = i
             break
     else:
         pos = len(tokens)
 
-    if is_spec_symb(tokens[0], '(') and is_spec_symb(tokens[-1], ')'):
-        par = 0
-        for s in tokens[1:-1]:
-            if is_spec_symb(s, '('):
-                par += 1
-            if is_spec_symb(s, ')'):
-                par -= 1
-            if par < 0:
-                break
-        if par == 0:
-            return next_op(tokens[1:-1])
+    if is_wrapped(tokens):
+        return next_op(tokens[1:-1])
 
     left = tokens[:pos]
     if len(left) == len(tokens):
+        if type(left[-1]) is Quantifier:
+            # Quantifier is passed as the right part.
+            return left[:-1], "{", left[-1:]
         return left[:-1], "*", []
     if is_spec_symb(tokens[pos], '|'):
         return left, "|", tokens[pos + 1:]
@@ -98,17 +114,28 @@ def next_op(tokens: list) -> (list, str, list):
     return left, "+", tokens[pos:]
 
 
-def parse_node(tokens: list) -> Node:
-    """Returns AST tree that represents the tokens."""
+def parse_node(tokens: list, groups: Optional[Dict[int, int]] = None) -> Node:
+    """
+    Returns AST tree that represents the tokens.
+    Groups are numbers of capturing groups by ids of their `(` tokens,
+    parenthesis are not kept in the tree without them.
+    """
+    if groups is not None and len(tokens) > 1 and is_wrapped(tokens):
+        return Group(parse_node(tokens[1:-1], groups), groups[id(tokens[0])])
+
     left, op_type, right = next_op(tokens)
 
     if op_type == "+":
-        return Concatenation(parse_node(left), parse_node(right))
+        return Concatenation(parse_node(left, groups), parse_node(right, groups))
     elif op_type == "|":
-        return Decision(parse_node(left), parse_node(right))
+        return Decision(parse_node(left, groups), parse_node(right, groups))
     elif op_type == "*":
-        return Clini(parse_node(left))
+        return Clini(parse_node(left, groups))
+    elif op_type == "{":
+        return Repetition(parse_node(left, groups), right[0].low, right[0].high)
     elif op_type == "v":
+        if type(left[0]) is Ranges:
+            return CharClass(left[0].ranges, left[0].text)
         return Value(left[0])
     else:
         raise ExpressionError("FATAL: Unexpected operation: ", op_type, '.')
@@ -122,8 +149,8 @@ def optimize_node(node: Node) -> Node:
         if node.value() == '*':
             if children[0].value() == '*':
                 return optimize_node(children[0])
-        else:
-            raise Exception("Operation with one argument is not Clini closure.")
+        elif node.value() != '{' and node.value() != '(':
+            raise Exception("Operation with one argument is not Clini closure, repetition or group.")
 
     return node
 
@@ -133,8 +160,12 @@ def optimize(tree: AST) -> AST:
     return AST(optimize_node(tree.root()))
 
 
-def parse(regexp: str) -> AST:
-    """Returns AST with additional checks and optimizations."""
+def parse(regexp: str, groups: bool = False) -> AST:
+    """
+    Returns AST with additional checks and optimizations.
+    If groups is set, parenthesis become capturing groups (`Group` nodes)
+    numbered by their opening parenthesis from 1, as in `re`.
+    """
     tokens = scan(regexp)
     if len(tokens) == 0:
         return AST(None)
@@ -142,4 +173,8 @@ def parse(regexp: str) -> AST:
     if not parenthesis_test(tokens):
         raise ParenthesisError("Amount of parenthesis isn't equal.")
 
-    return optimize(AST(parse_node(tokens)))
+    numbers: Optional[Dict[int, int]] = None
+    if groups:
+        openings = [token for token in tokens if is_spec_symb(token, '(')]
+        numbers = {id(token): i + 1 for i, token in enumerate(openings)}
+    return optimize(AST(parse_node(tokens, numbers)))
@@ -1,10 +1,16 @@
-from ast.errors import BadEscapedSymbolError, UnexpectedEndError
+from typing import List, Optional
+
+from ast.errors import BadEscapedSymbolError, UnexpectedEndError, CharClassError, QuantifierError
+from automaton.intervals import Interval, MAX_SYMBOL, normalize, negate, symbol
 
 __all__ = ["scan"]
 
 special = {'|', '*', '(', ')'}
 
-escapedSymbols = ['\\', '(', ')', '*', '|']
+escapedSymbols = ['\\', '(', ')', '*', '|', '[', ']', '.', '+', '?', '{', '}']
+
+# Symbols that must be escaped inside of the class of characters.
+classEscapedSymbols = ['\\', '[', ']', '^', '-']
 
 
 class Special:
@@ -17,6 +23,107 @@ class Special:
         return "special{" + self.s + "}"
 
 
+class Quantifier(Special):
+    """Represents repetition operators `+`, `?` and `{m,n}` (max is None if it is unlimited)."""
+
+    def __init__(self, seq: str, low: int, high: Optional[int]):
+        super().__init__(seq)
+        self.low = low
+        self.high = high
+
+
+class Ranges:
+    """Represents class of characters (`[a-z]`, `[^a]` or `.`) as sorted disjoint intervals."""
+
+    def __init__(self, ranges: List[Interval], text: str):
+        self.ranges = ranges
+        self.text = text
+
+    def __str__(self) -> str:
+        return "ranges{" + self.text + "}"
+
+
+def is_symbol(token) -> bool:
+    """Checks whether the token is a single symbol or a class of them."""
+    return type(token) is str or type(token) is Ranges
+
+
+def scan_class(s: str, start: int) -> (Ranges, int):
+    """
+    Returns class of characters that begins after `[` at start position
+    and position after its closing `]`.
+    """
+    i = start
+    negated = False
+    if i < len(s) and s[i] == '^':
+        negated = True
+        i += 1
+
+    # Symbols of the class, ranges are marked by None between their ends.
+    symbols: list = []
+    while True:
+        if i >= len(s):
+            raise UnexpectedEndError("Class of characters is not closed.")
+        char = s[i]
+        i += 1
+        if char == ']':
+            break
+        if char == '\\':
+            if i >= len(s):
+                raise UnexpectedEndError("Escape cannot be at the end of expression.")
+            if s[i] not in classEscapedSymbols:
+                raise BadEscapedSymbolError("\\" + s[i] + " is not allowed in class of characters.")
+            symbols.append(s[i])
+            i += 1
+        elif char == '-' and len(symbols) > 0 and i < len(s) and s[i] != ']':
+            symbols.append(None)
+        else:
+            symbols.append(char)
+
+    if len(symbols) == 0:
+        raise CharClassError("Class of characters is empty.")
+
+    ranges: List[Interval] = []
+    j = 0
+    while j < len(symbols):
+        if j + 2 < len(symbols) and symbols[j + 1] is None:
+            lo, hi = ord(symbols[j]), ord(symbols[j + 2])
+            if lo > hi:
+                raise CharClassError("Range {}-{} is reversed.".format(symbols[j], symbols[j + 2]))
+            ranges.append((lo, hi))
+            j += 3
+        elif symbols[j] is None:
+            raise CharClassError("Range has no start.")
+        else:
+            ranges.append(symbol(symbols[j]))
+            j += 1
+
+    ranges = negate(ranges) if negated else normalize(ranges)
+    return Ranges(ranges, s[start - 1:i]), i
+
+
+def scan_quantifier(s: str, start: int) -> (Quantifier, int):
+    """
+    Returns quantifier `{m}`, `{m,}`, `{,n}` or `{m,n}` that begins after `{`
+    at start position and position after its closing `}`.
+    """
+    end = s.find('}', start)
+    if end < 0:
+        raise UnexpectedEndError("Quantifier is not closed.")
+    bounds = s[start:end].split(',')
+    if len(bounds) > 2 or not all(b.isdecimal() or (b == '' and len(bounds) == 2) for b in bounds):
+        raise QuantifierError("Quantifier {" + s[start:end] + "} is malformed.")
+
+    low = int(bounds[0]) if bounds[0] != '' else 0
+    if len(bounds) == 1:
+        high = low
+    else:
+        high = int(bounds[1]) if bounds[1] != '' else None
+    if high is not None and high < low:
+        raise QuantifierError("Quantifier {" + s[start:end] + "} has maximum less than minimum.")
+    return Quantifier(s[start - 1:end + 1], low, high), end + 1
+
+
 def scan(s: str) -> list:
     """
     Returns list of tokens.
@@ -25,7 +132,10 @@ def scan(s: str) -> list:
     tokens: list = []
 
     escaped = False
-    for char in s:
+    i = 0
+    while i < len(s):
+        char = s[i]
+        i += 1
         if escaped:
             if char in escapedSymbols:
                 tokens.append(char)
@@ -37,6 +147,18 @@ def scan(s: str) -> list:
                 escaped = True
             elif char in special:
                 tokens.append(Special(char))
+            elif char == '[':
+                ranges, i = scan_class(s, i)
+                tokens.append(ranges)
+            elif char == '.':
+                tokens.append(Ranges([(0, MAX_SYMBOL)], char))
+            elif char == '+':
+                tokens.append(Quantifier(char, 1, None))
+            elif char == '?':
+                tokens.append(Quantifier(char, 0, 1))
+            elif char == '{':
+                quantifier, i = scan_quantifier(s, i)
+                tokens.append(quantifier)
             else:
                 tokens.append(char)
                 escaped = False
@@ -1,4 +1,8 @@
-__all__ = ["Node", "AST", "Value", "Concatenation", "Decision", "Clini"]
+from typing import List, Optional, Tuple
+
+from automaton.intervals import Interval, symbol
+
+__all__ = ["Node", "AST", "Value", "CharClass", "Concatenation", "Decision", "Clini", "Repetition", "Group"]
 
 
 class Node:
@@ -43,6 +47,25 @@ class Value(Node):
     def __init__(self, s: chr):
         super().__init__(s, None, None)
 
+    def ranges(self) -> List[Interval]:
+        """Returns intervals of symbols that the leaf matches."""
+        return [symbol(self.value())]
+
+    def __str__(self) -> str:
+        return self.value()
+
+
+class CharClass(Node):
+    """CharClass is a leaf that represents class of characters (`[a-z]`, `[^a]`, `.`)."""
+
+    def __init__(self, ranges: List[Interval], text: str):
+        super().__init__(text, None, None)
+        self.__ranges: List[Interval] = ranges
+
+    def ranges(self) -> List[Interval]:
+        """Returns intervals of symbols that the leaf matches."""
+        return self.__ranges
+
     def __str__(self) -> str:
         return self.value()
 
@@ -75,3 +98,38 @@ class Clini(Node):
 
     def __str__(self) -> str:
         return "({})*".format(self.lchild.__str__())
+
+
+class Repetition(Node):
+    """Repetition is a node that represents `+`, `?` and `{m,n}` operations."""
+
+    def __init__(self, child: Node, low: int, high: Optional[int]):
+        super().__init__('{', child, None)
+        self.__bounds: Tuple[int, Optional[int]] = low, high
+
+    def bounds(self) -> Tuple[int, Optional[int]]:
+        """Returns minimal and maximal (None if unlimited) amount of repetitions."""
+        return self.__bounds
+
+    def __str__(self) -> str:
+        low, high = self.__bounds
+        if high is None:
+            suffix = "+" if low == 1 else "{" + str(low) + ",}"
+        elif low == 0 and high == 1:
+            suffix = "?"
+        elif low == high:
+            suffix = "{" + str(low) + "}"
+        else:
+            suffix = "{" + str(low) + "," + str(high) + "}"
+        return "({})".format(self.lchild.__str__()) + suffix
+
+
+class Group(Node):
+    """Group is a node that represents capturing group `(...)` with its number (from 1)."""
+
+    def __init__(self, child: Node, number: int):
+        super().__init__('(', child, None)
+        self.number: int = number
+
+    def __str__(self) -> str:
+        return "({})".format(self.lchild.__str__())
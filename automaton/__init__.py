@@ -1,6 +1,30 @@
+from .errors import *
+from .budget import *
 from .ndfa import *
 from .dfa import *
+from .stream import *
+from .equivalence import *
+from .utf8 import *
+from .bitnfa import *
+from .lazy import *
+from .parallel import *
+from .pike import *
+from .approximate import *
+from .analytics import *
+from .wordset import *
 
 __all__ = []
+__all__ += errors.__all__
+__all__ += budget.__all__
 __all__ += ndfa.__all__
 __all__ += dfa.__all__
+__all__ += stream.__all__
+__all__ += equivalence.__all__
+__all__ += utf8.__all__
+__all__ += bitnfa.__all__
+__all__ += lazy.__all__
+__all__ += parallel.__all__
+__all__ += pike.__all__
+__all__ += approximate.__all__
+__all__ += analytics.__all__
+__all__ += wordset.__all__
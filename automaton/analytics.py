@@ -0,0 +1,252 @@
+import random
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from automaton.dfa import DFA
+from automaton.intervals import Interval, BYTE_ALPHABET_SIZE
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__all__ = ["is_empty", "is_universal", "is_finite", "count_words", "count_words_upto", "Sampler"]
+
+# Counts of moves between useful states: row of every state is a dictionary
+# of end states and amounts of symbols that lead to them.
+Counts = List[Dict[int, int]]
+# The biggest power of two of counts of int64 matrices.
+INT64_BITS = 62
+
+
+def useful_states(dfa: DFA) -> List[int]:
+    """Returns sorted states that are reachable from the initial state and are not dead."""
+    graph = dfa.T.get_graph()
+    dead = dfa.dead_states()
+    reachable: Set[int] = set()
+    stack = [0]
+    while len(stack) > 0:
+        state = stack.pop()
+        if state in reachable or state in dead:
+            continue
+        reachable.add(state)
+        stack.extend(graph.get(state, dict()).values())
+    return sorted(reachable)
+
+
+def counts_of(dfa: DFA) -> Tuple[Counts, List[bool]]:
+    """
+    Returns counts of moves between useful states (renumbered from 0,
+    the initial state is 0) and their finality.
+    """
+    states = useful_states(dfa)
+    number = {state: i for i, state in enumerate(states)}
+    graph = dfa.T.get_graph()
+    rows: Counts = []
+    for state in states:
+        row: Dict[int, int] = dict()
+        for (lo, hi), end in graph.get(state, dict()).items():
+            if end in number:
+                row[number[end]] = row.get(number[end], 0) + hi - lo + 1
+        rows.append(row)
+    return rows, [state in dfa.F for state in states]
+
+
+def is_empty(dfa: DFA) -> bool:
+    """Checks whether the automaton accepts no words."""
+    return 0 in dfa.dead_states()
+
+
+def is_universal(dfa: DFA) -> bool:
+    """Checks whether the automaton accepts every word of its alphabet."""
+    return 0 in dfa.universal_states()
+
+
+def is_finite(dfa: DFA) -> bool:
+    """Checks whether the language is finite: useful states have no cycles."""
+    rows, _ = counts_of(dfa)
+    # Depth-first search with colors: 1 is on the path, 2 is finished.
+    color = [0] * len(rows)
+    for root in range(len(rows)):
+        if color[root] != 0:
+            continue
+        stack: List[Tuple[int, List[int]]] = [(root, list(rows[root]))]
+        color[root] = 1
+        while len(stack) > 0:
+            state, ends = stack[-1]
+            if len(ends) == 0:
+                color[state] = 2
+                stack.pop()
+                continue
+            end = ends.pop()
+            if color[end] == 1:
+                return False
+            if color[end] == 0:
+                color[end] = 1
+                stack.append((end, list(rows[end])))
+    return True
+
+
+def count_words_upto(dfa: DFA, max_length: int) -> List[int]:
+    """Returns amounts of accepted words of every length from 0 to max_length."""
+    rows, finals = counts_of(dfa)
+    return words_upto(rows, finals, max_length)
+
+
+def words_upto(rows: Counts, finals: List[bool], max_length: int) -> List[int]:
+    """Returns amounts of accepted words of every length by counts of moves."""
+    if len(rows) == 0:
+        return [0] * (max_length + 1)
+    # Amounts of words of the current length that lead to every state.
+    words = [0] * len(rows)
+    words[0] = 1
+    result: List[int] = []
+    for _ in range(max_length + 1):
+        result.append(sum(amount for amount, final in zip(words, finals) if final))
+        new_words = [0] * len(rows)
+        for state, amount in enumerate(words):
+            if amount != 0:
+                for end, symbols in rows[state].items():
+                    new_words[end] += amount * symbols
+        words = new_words
+    return result
+
+
+def multiply(a: List[List[int]], b: List[List[int]]) -> List[List[int]]:
+    """Returns product of square matrices of Python ints (zeros are skipped)."""
+    size = len(a)
+    product = []
+    for i in range(size):
+        row = [0] * size
+        for k, x in enumerate(a[i]):
+            if x != 0:
+                for j, y in enumerate(b[k]):
+                    if y != 0:
+                        row[j] += x * y
+        product.append(row)
+    return product
+
+
+def count_words(dfa: DFA, length: int) -> int:
+    """
+    Returns amount of accepted words of the length.
+
+    Short lengths are counted by dynamic programming over the moves,
+    long ones by repeated squaring of the matrix of counts of moves.
+    """
+    rows, finals = counts_of(dfa)
+    size = len(rows)
+    if size == 0:
+        return 0
+    moves = sum(len(row) for row in rows)
+    widest = max(sum(row.values()) for row in rows)
+    # Counts grow up to length * log(widest) bits (digits of 64 bits): the dynamic
+    # programming multiplies them by small counts of moves once per symbol, squaring
+    # multiplies them by each other (Karatsuba, digits^1.585) size^3 times per bit.
+    digits = max(1, length * widest.bit_length() // 64)
+    if length * moves * digits <= size ** 3 * (length.bit_length() + digits ** 1.585):
+        return words_upto(rows, finals, length)[length]
+    return words_by_squaring(rows, finals, length)
+
+
+def words_by_squaring(rows: Counts, finals: List[bool], length: int) -> int:
+    """
+    Returns amount of accepted words of the length by repeated squaring of the matrix
+    of counts of moves (NumPy is used if it is installed: int64 while counts fit into it,
+    Python ints of object arrays otherwise).
+    """
+    size = len(rows)
+    matrix = [[row.get(j, 0) for j in range(size)] for row in rows]
+    widest = max(sum(row.values()) for row in rows)
+    if numpy is not None:
+        exact = length * widest.bit_length() <= INT64_BITS
+        matrix = numpy.array(matrix, dtype=numpy.int64 if exact else object)
+        power = numpy.identity(size, dtype=matrix.dtype)
+        while length > 0:
+            if length & 1:
+                power = power.dot(matrix)
+            length >>= 1
+            if length > 0:
+                matrix = matrix.dot(matrix)
+        return int(sum(int(power[0][j]) for j in range(size) if finals[j]))
+
+    power = [[int(i == j) for j in range(size)] for i in range(size)]
+    while length > 0:
+        if length & 1:
+            power = multiply(power, matrix)
+        length >>= 1
+        if length > 0:
+            matrix = multiply(matrix, matrix)
+    return sum(power[0][j] for j in range(size) if finals[j])
+
+
+class Sampler:
+    """
+    Uniform random sampling of accepted words of lengths up to max_length.
+
+    Amounts of accepted continuations of every length are precomputed
+    for every state, so the move is chosen with probability proportional
+    to amount of words that continue through it, and every word of the
+    length has the same probability.
+    """
+
+    def __init__(self, dfa: DFA, max_length: int, rng: Optional[random.Random] = None):
+        """Constructor of the sampler of the automaton."""
+        self.max_length: int = max_length
+        self.rng: random.Random = rng or random.Random()
+        self.alphabet: int = dfa.alphabet
+        rows, finals = counts_of(dfa)
+        states = useful_states(dfa)
+        number = {state: i for i, state in enumerate(states)}
+        graph = dfa.T.get_graph()
+        # Moves of useful states to useful states.
+        self.__moves: List[List[Tuple[Interval, int]]] = [
+            [(interval, number[end]) for interval, end in sorted(graph.get(state, dict()).items()) if end in number]
+            for state in states]
+        # Amounts of accepted words of length l from every state.
+        self.__words: List[List[int]] = [[int(final) for final in finals]]
+        for _ in range(max_length):
+            shorter = self.__words[-1]
+            self.__words.append([sum(symbols * shorter[end] for end, symbols in row.items()) for row in rows])
+
+    def count(self, length: int) -> int:
+        """Returns amount of accepted words of the length."""
+        if length > self.max_length:
+            raise ValueError("Length is bigger than the maximal length of the sampler.")
+        words = self.__words[length]
+        return words[0] if len(words) > 0 else 0
+
+    def sample(self, length: int) -> Union[str, bytes, None]:
+        """
+        Returns uniformly chosen accepted word of the length or None if there are no such words
+        (words of automata with byte alphabet are bytes).
+        """
+        if self.count(length) == 0:
+            return None
+        codes: List[int] = []
+        state = 0
+        for left in range(length, 0, -1):
+            shorter = self.__words[left - 1]
+            # Choose the word number and find the move that contains it.
+            choice = self.rng.randrange(self.__words[left][state])
+            for (lo, hi), end in self.__moves[state]:
+                amount = (hi - lo + 1) * shorter[end]
+                if choice < amount:
+                    codes.append(lo + choice // shorter[end])
+                    state = end
+                    break
+                choice -= amount
+        if self.alphabet == BYTE_ALPHABET_SIZE:
+            return bytes(codes)
+        return "".join(map(chr, codes))
+
+    def sample_upto(self, max_length: Optional[int] = None) -> Union[str, bytes, None]:
+        """Returns uniformly chosen accepted word of length up to max_length or None."""
+        max_length = self.max_length if max_length is None else max_length
+        total = sum(self.count(length) for length in range(max_length + 1))
+        if total == 0:
+            return None
+        choice = self.rng.randrange(total)
+        for length in range(max_length + 1):
+            if choice < self.count(length):
+                return self.sample(length)
+            choice -= self.count(length)
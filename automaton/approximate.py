@@ -0,0 +1,168 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from automaton.bitnfa import BitNFA
+from automaton.intervals import word_of
+from automaton.ndfa import NDFA, NonDetTransitions
+
+__all__ = ["ApproximateMatcher"]
+
+# Sets of states of NDFA for every amount of errors from 0 to k.
+Levels = Tuple[int, ...]
+
+
+class Product:
+    """States and moves of the product that were built so far."""
+
+    __slots__ = ("index", "levels", "moves", "distances")
+
+    def __init__(self):
+        # Number of the state by its levels.
+        self.index: Dict[Levels, int] = dict()
+        self.levels: List[Levels] = []
+        # Moves of the states by symbols, -1 is the dead state.
+        self.moves: List[Dict[Union[str, int], int]] = []
+        # The least amount of errors of final states of the levels.
+        self.distances: List[Optional[int]] = []
+
+
+class ApproximateMatcher:
+    """
+    Matching of words within k edits (insertions, deletions and substitutions
+    of symbols) of some word of the NDFA language.
+
+    It is the product of the NDFA with Levenshtein automaton: the state is
+    a set of states of NDFA for every amount of errors (`Levels`), where
+    level e contains states reachable with at most e errors.
+    By symbol c new levels are
+    `R'[e] = step(R[e], c) | R'[e - 1] | R[e - 1] | any(R[e - 1]) | any(R'[e - 1])`,
+    where `any` moves by any symbol: exact move, more errors allowed,
+    insertion of c, substitution of c and deletion of the symbol of the pattern.
+
+    States of the product are built lazily during matching with the cache
+    of `LazyDFA`, so every word is read once; at most max_states of them
+    are kept, a full cache is dropped between symbols (`flushes` counts it).
+    The matcher can be shared between threads: built moves are read without
+    the lock, new states and flushes are made under it.
+    """
+
+    def __init__(self, nd: NDFA, k: int, max_states: int = 10000):
+        """Constructor of the matcher of the automaton within k errors, max_states is at least 2."""
+        if k < 0:
+            raise ValueError("Amount of errors can't be negative.")
+        if max_states < 2:
+            raise ValueError("The cache keeps at least the initial and the current states.")
+        self.k: int = k
+        self.alphabet: int = nd.alphabet
+        self.max_states: int = max_states
+        self.flushes: int = 0
+        self.nfa: BitNFA = BitNFA(nd)
+        # Moves of every transition by any symbol are moves of the only class.
+        anything = NonDetTransitions()
+        for orig, _, end in nd.T:
+            anything.add(orig, (0, nd.alphabet - 1), end)
+        self.__any: BitNFA = BitNFA(NDFA(nd.I, nd.F, anything, nd.alphabet))
+        self.__start: Levels = self.__initial()
+        self.__lock = threading.Lock()
+        self.__cache: Product = self.__new_cache()
+
+    def __anything(self, states: int) -> int:
+        """Returns states after the move by any symbol."""
+        return self.__any.step(states, 0) if states != 0 else 0
+
+    def __initial(self) -> Levels:
+        """Returns levels of the empty word: only deletions are made."""
+        levels = [self.nfa.start]
+        for _ in range(self.k):
+            levels.append(levels[-1] | self.__anything(levels[-1]))
+        return tuple(levels)
+
+    def __next(self, levels: Levels, symb: Union[str, int]) -> Levels:
+        """Returns levels after reading of the symbol."""
+        cls = self.nfa.classify(symb)
+        new_levels: List[int] = []
+        for e, states in enumerate(levels):
+            new = self.nfa.step(states, cls) if cls >= 0 and states != 0 else 0
+            if e > 0:
+                previous = levels[e - 1]
+                new |= new_levels[-1] | previous | self.__anything(previous) | self.__anything(new_levels[-1])
+            new_levels.append(new)
+        return tuple(new_levels)
+
+    def __new_cache(self) -> Product:
+        """Returns empty cache with the initial state (number 0)."""
+        cache = Product()
+        self.__state(cache, self.__start)
+        return cache
+
+    def __state(self, cache: Product, levels: Levels) -> int:
+        """Returns number of the state of the levels (it is called under the lock)."""
+        number = cache.index.get(levels)
+        if number is None:
+            number = len(cache.levels)
+            final = self.nfa.final
+            # The row is complete before the number is used anywhere.
+            cache.levels.append(levels)
+            cache.distances.append(next((e for e, states in enumerate(levels) if states & final), None))
+            cache.moves.append(dict())
+            cache.index[levels] = number
+        return number
+
+    def __flush(self, cache: Product, state: int) -> Tuple[Product, int]:
+        """Replaces full cache by the new one, returns it and the state inside it."""
+        if cache is self.__cache:
+            self.flushes += 1
+            self.__cache = self.__new_cache()
+        fresh = self.__cache
+        return fresh, self.__state(fresh, cache.levels[state])
+
+    def __move(self, cache: Product, state: int, symb: Union[str, int]) -> int:
+        """Builds the move of the state by the symbol, -1 if no state is reachable."""
+        levels = self.__next(cache.levels[state], symb)
+        # Levels include each other, so all of them are empty if the last one is.
+        end = self.__state(cache, levels) if levels[-1] != 0 else -1
+        cache.moves[state][symb] = end
+        return end
+
+    def __put(self, cache: Product, state: int, symb: Union[str, int]) -> Tuple[Product, int]:
+        """Returns cache and the state after the move by the symbol (the cache can be replaced by flush)."""
+        with self.__lock:
+            # Another thread could build the move while this one waited.
+            end = cache.moves[state].get(symb)
+            if end is None:
+                if len(cache.levels) >= self.max_states:
+                    cache, state = self.__flush(cache, state)
+                end = self.__move(cache, state, symb)
+        return cache, end
+
+    def __len__(self) -> int:
+        """Returns amount of states that are built."""
+        return len(self.__cache.levels)
+
+    def distance(self, w: Union[str, bytes, bytearray, memoryview]) -> Optional[int]:
+        """
+        Returns the minimal amount of edits that turn the word into some word
+        of the language, or None if it is more than k.
+        """
+        w = word_of(w, self.alphabet)
+        symbols: Iterable = w if isinstance(w, str) else memoryview(w).cast('B')
+        cache = self.__cache
+        moves = cache.moves
+        state = 0
+        for symb in symbols:
+            end = moves[state].get(symb)
+            if end is None:
+                cache, end = self.__put(cache, state, symb)
+                moves = cache.moves
+            if end < 0:
+                return None
+            state = end
+        return cache.distances[state]
+
+    def fullmatch(self, w: Union[str, bytes, bytearray, memoryview]) -> bool:
+        """Checks whether the word is within k edits of the language."""
+        return self.distance(w) is not None
+
+    def distances(self, words: Iterable[Union[str, bytes]]) -> List[Optional[int]]:
+        """Returns distances of the words (see `distance`), they share built states."""
+        return [self.distance(w) for w in words]
@@ -0,0 +1,148 @@
+from typing import Dict, Iterable, List, Union
+
+from automaton.intervals import Interval, split, find, word_of
+from automaton.ndfa import NDFA
+
+__all__ = ["BitNFA", "BitNFACursor"]
+
+# Amount of states that are moved at once by one precomputed table.
+CHUNK = 8
+# Amount of symbols with remembered classes, the cache of classes is dropped when it is full.
+KNOWN_LIMIT = 1 << 12
+
+
+class BitNFA:
+    """
+    Bit-parallel simulation of NDFA: set of current states is an int,
+    where bit number s is set if the automaton is in state s.
+
+    Symbols are divided into classes (disjoint intervals with the same moves),
+    move of the whole set by a class takes one lookup per CHUNK states
+    in tables that are built on the first use. Classes of met symbols are
+    remembered, at most KNOWN_LIMIT of them: wide classes like `.` have
+    countless symbols. Tables are only added and the full cache of classes
+    is replaced by the new one, so the automaton can be shared between threads.
+    """
+
+    def __init__(self, nd: NDFA):
+        """Constructor of simulation of the automaton."""
+        self.alphabet: int = nd.alphabet
+        self.start: int = sum(1 << state for state in nd.I)
+        self.final: int = sum(1 << state for state in nd.F)
+        self.size: int = len(nd)
+
+        # Classes of symbols: sorted disjoint intervals with moves of every state.
+        labelled = [(interval, (orig, end)) for orig, interval, end in nd.T]
+        self.__starts: List[int] = []
+        self.__ends: List[int] = []
+        self.__follow: List[Dict[int, int]] = []
+        for (lo, hi), moves in split(labelled):
+            follow: Dict[int, int] = dict()
+            for orig, end in moves:
+                follow[orig] = follow.get(orig, 0) | (1 << end)
+            self.__starts.append(lo)
+            self.__ends.append(hi)
+            self.__follow.append(follow)
+        # Classes of the symbols that were already met.
+        self.__known: Dict[Union[str, int], int] = dict()
+        # Tables of moves: class -> number of chunk -> chunk of states -> ends.
+        self.__tables: List[Dict[int, List[int]]] = [dict() for _ in self.__follow]
+
+    def classes(self) -> List[Interval]:
+        """Returns intervals of the classes of symbols."""
+        return list(zip(self.__starts, self.__ends))
+
+    def classify(self, symb: Union[str, int]) -> int:
+        """Returns class of the symbol (or byte) or -1 if there are no moves by it."""
+        known = self.__known
+        cls = known.get(symb)
+        if cls is None:
+            code = symb if isinstance(symb, int) else ord(symb)
+            cls = find(self.__starts, self.__ends, code)
+            if len(known) >= KNOWN_LIMIT:
+                known = self.__known = dict()
+            known[symb] = cls
+        return cls
+
+    def __table(self, cls: int, chunk: int) -> List[int]:
+        """Returns ends of moves by the class for all subsets of the chunk of states."""
+        table = self.__tables[cls].get(chunk)
+        if table is None:
+            follow = self.__follow[cls]
+            first = chunk * CHUNK
+            table = [0] * (1 << CHUNK)
+            # Every subset is the smaller subset and its lowest state.
+            for subset in range(1, 1 << CHUNK):
+                low = subset & -subset
+                table[subset] = table[subset ^ low] | follow.get(first + low.bit_length() - 1, 0)
+            self.__tables[cls][chunk] = table
+        return table
+
+    def step(self, states: int, cls: int) -> int:
+        """Returns states after the move of the states by the class."""
+        ends = 0
+        chunk = 0
+        while states:
+            subset = states & ((1 << CHUNK) - 1)
+            if subset:
+                ends |= self.__table(cls, chunk)[subset]
+            states >>= CHUNK
+            chunk += 1
+        return ends
+
+    def cursor(self) -> 'BitNFACursor':
+        """Returns new cursor positioned at the initial states."""
+        return BitNFACursor(self)
+
+    def fullmatch(self, w: Union[str, bytes, bytearray, memoryview]) -> bool:
+        """
+        Checks whether the whole word is accepted,
+        automata with byte alphabet match bytes-like objects (see `automaton.intervals.word_of`).
+        """
+        w = word_of(w, self.alphabet)
+        symbols: Iterable = w if isinstance(w, str) else memoryview(w).cast('B')
+        classify = self.classify
+        step = self.step
+        states = self.start
+        for symb in symbols:
+            cls = classify(symb)
+            if cls < 0:
+                return False
+            states = step(states, cls)
+            if states == 0:
+                return False
+        return states & self.final != 0
+
+
+class BitNFACursor:
+    """Current states of matching inside a BitNFA."""
+
+    __slots__ = ("_automaton", "states")
+
+    def __init__(self, nfa: BitNFA):
+        """Constructor for cursor of the automaton."""
+        self._automaton: BitNFA = nfa
+        self.states: int = nfa.start
+
+    def put(self, symb: Union[str, int]) -> bool:
+        """
+        Do one move inside the automaton by the symbol (or byte).
+        Returns False if no continuation can be accepted anymore.
+        """
+        if self.states == 0:
+            return False
+        cls = self._automaton.classify(symb)
+        self.states = self._automaton.step(self.states, cls) if cls >= 0 else 0
+        return self.states != 0
+
+    def reset(self) -> None:
+        """Reset current states."""
+        self.states = self._automaton.start
+
+    def in_final_state(self) -> bool:
+        """Checks whether the automaton is into one of finite states."""
+        return self.states & self._automaton.final != 0
+
+    def in_dead_state(self) -> bool:
+        """Checks whether no continuation can be accepted anymore."""
+        return self.states == 0
@@ -0,0 +1,54 @@
+import time
+from typing import Optional
+
+from automaton.errors import BuildStats, BudgetExceededError
+
+__all__ = ["Budget", "Meter"]
+
+
+class Budget:
+    """
+    Limits of building of automata: maximum amount of DFA states,
+    maximum amount of transitions, maximum wall time in seconds
+    and cancellation token (any object with `is_set()`, for example
+    `threading.Event`). None means no limit.
+    """
+
+    def __init__(self, max_states: Optional[int] = None, max_transitions: Optional[int] = None,
+                 max_time: Optional[float] = None, cancel=None):
+        self.max_states: Optional[int] = max_states
+        self.max_transitions: Optional[int] = max_transitions
+        self.max_time: Optional[float] = max_time
+        self.cancel = cancel
+
+    def meter(self, stage: str) -> 'Meter':
+        """Starts measuring of the stage of building."""
+        return Meter(self, stage)
+
+
+class Meter:
+    """Checks the budget during one stage of building."""
+
+    __slots__ = ("_budget", "_stage", "_start", "_deadline")
+
+    def __init__(self, budget: Budget, stage: str):
+        self._budget: Budget = budget
+        self._stage: str = stage
+        self._start: float = time.monotonic()
+        self._deadline: Optional[float] = None if budget.max_time is None else self._start + budget.max_time
+
+    def check(self, states: int, transitions: int) -> None:
+        """Raises BudgetExceededError if the amounts or the time exceed the budget or building is cancelled."""
+        budget = self._budget
+        limit = None
+        if budget.max_states is not None and states > budget.max_states:
+            limit = "states"
+        elif budget.max_transitions is not None and transitions > budget.max_transitions:
+            limit = "transitions"
+        elif budget.cancel is not None and budget.cancel.is_set():
+            limit = "cancel"
+        elif self._deadline is not None and time.monotonic() > self._deadline:
+            limit = "time"
+        if limit is not None:
+            seconds = time.monotonic() - self._start
+            raise BudgetExceededError(BuildStats(self._stage, limit, states, transitions, seconds))
@@ -1,18 +1,151 @@
+from itertools import islice
 from typing import *
 
 from automaton import NDFA
+from automaton.budget import Budget
+from automaton.intervals import Interval, ALPHABET_SIZE, BYTE_ALPHABET_SIZE, negate, split, find, label, word_of
+
+__all__ = ["DFA", "DFACursor"]
+
+# Self-loops with more symbols (or with more symbols that leave them) are
+# not skipped by the matching, because checks of them become slower than stepping.
+MAX_LOOP_SYMBOLS = 32
+# Initial size of the piece of the word that is checked for self-loop run.
+LOOP_WINDOW = 16
+# Amount of short runs after which the matching stops skipping, because
+# the checks of short runs are slower than stepping through them.
+LOOP_MISSES = 8
+# Intervals with more symbols are not expanded into symbols of move tables,
+# they are found by binary search.
+EXPAND_LIMIT = 256
+# Amount of states between checks of the budget by minimization.
+CHECK_PERIOD = 1024
+
+# Sorted disjoint intervals (starts and ends) and codes of their end states.
+WideMoves = Tuple[List[int], List[int], List[int]]
+
+
+class RunTables(NamedTuple):
+    """
+    Tables for fast matching.
+
+    Codes of states in `start`, `rows` and `wide` are the numbers of states, except:
+    -1 is the code of all dead states,
+    -(u + 2) is the code of universal state u,
+    -(l + 2 + len(rows)) is the code of state l that has self-loops.
+    `plain` rows are the same, but without codes of states with self-loops.
+    """
+    # Code of initial state.
+    start: int
+    # Moves by symbols of small intervals from every state.
+    rows: List[Dict[str, int]]
+    plain: List[Dict[str, int]]
+    # Moves by big intervals from every state (None if there are no such moves).
+    wide: List[Optional[WideMoves]]
+    # Finality of every state.
+    finals: List[bool]
+    # Symbols of self-loops of every state (or symbols that leave the loop
+    # if the flag is True), None if the loop is not skipped.
+    loops: List[Optional[Tuple[str, bool]]]
+
+
+class ByteTables(NamedTuple):
+    """
+    Tables for fast matching of bytes by automaton with byte alphabet,
+    every row has codes (see `RunTables`) for all 256 bytes.
+    """
+    start: int
+    rows: List[List[int]]
+    plain: List[List[int]]
+    finals: List[bool]
+    loops: List[Optional[Tuple[bytes, bool]]]
+
+
+def wide_end(moves: WideMoves, symb: str) -> int:
+    """Returns code of end state of the move by the symbol or -1."""
+    i = find(moves[0], moves[1], ord(symb))
+    if i < 0:
+        return -1
+    return moves[2][i]
+
+
+def in_run(w: Union[str, bytes], begin: int, end: int, symbols: Union[str, bytes], leaving: bool) -> bool:
+    """
+    Checks whether all symbols of w[begin:end] are the symbols of the run
+    (if leaving is True, the run consists of all symbols except the symbols).
+    """
+    if leaving:
+        for symb in symbols:
+            if w.find(symb, begin, end) >= 0:
+                return False
+        return True
 
-__all__ = ["DFA"]
+    count = 0
+    for symb in symbols:
+        count += w.count(symb, begin, end)
+    return count == end - begin
+
+
+def run_length(w: Union[str, bytes], start: int, symbols: Union[str, bytes], leaving: bool) -> int:
+    """Returns length of the run of the symbols in w that begins at start, see `in_run`."""
+    # Everything before pos is in the run, end is the end of checked piece.
+    pos = start
+    end = start
+    window = LOOP_WINDOW
+    # Pieces of growing size are counted at C level while they are in the run.
+    while end < len(w):
+        end = min(pos + window, len(w))
+        if not in_run(w, pos, end, symbols, leaving):
+            break
+        pos = end
+        window *= 2
+    else:
+        return pos - start
+
+    # The run ends inside the piece, find the end by halving.
+    while end - pos > LOOP_WINDOW:
+        middle = (pos + end) // 2
+        if in_run(w, pos, middle, symbols, leaving):
+            pos = middle
+        else:
+            end = middle
+    if leaving:
+        for symb in symbols:
+            found = w.find(symb, pos, end)
+            if found >= 0:
+                end = found
+        return end - start
+    piece = w[pos:end]
+    return pos + len(piece) - len(piece.lstrip(symbols)) - start
+
+
+def skip_run(it: Iterator, w: Union[str, bytes], start: int, loop: Tuple[Union[str, bytes], bool]) -> int:
+    """
+    Advances iterator of w over the run of the loop symbols that begins at start.
+    Returns length of the run.
+    """
+    symbols, leaving = loop
+    if start >= len(w) or (w[start] in symbols) == leaving:
+        return 0
+    length = run_length(w, start, symbols, leaving)
+    # Consumes the symbols without Python level loop.
+    next(islice(it, length - 1, None))
+    return length
 
 
 class DetTransitions:
-    """Class that implements transition table for deterministic state machine."""
+    """
+    Class that implements transition table for deterministic state machine.
+    Moves are labelled by intervals of code points, intervals of one state are disjoint.
+    """
 
-    def __init__(self, d: Dict[int, Dict[str, int]] = None):
+    def __init__(self, d: Dict[int, Dict[Interval, int]] = None):
         """Constructor for transitions of DFA."""
         if d is None:
             d = dict()
         self.__graph = d
+        # Sorted starts, ends and end states of intervals of states, they are built by lookups.
+        self.__sorted: Dict[int, WideMoves] = dict()
 
     def get_graph(self):
         """Returns transition graph."""
@@ -24,22 +157,33 @@ class DetTransitions:
             for symb, end_state in moves.items():
                 yield origin_state, symb, end_state,
 
-    def add(self, from_state: int, symb: str, to_state: int):
+    def add(self, from_state: int, symb: Interval, to_state: int):
         """Adds new state or replace the existing one's end state."""
         if from_state not in self.__graph:
             self.__graph[from_state] = dict()
 
         self.__graph[from_state][symb] = to_state
+        self.__sorted.pop(from_state, None)
 
-    def get_end(self, from_state: int, symb: str) -> int:
+    def get_end(self, from_state: int, symb: Union[str, int]) -> int:
         """
-        Returns end state of transition from the state by symbol or
+        Returns end state of transition from the state by symbol (or byte) or
         :raises KeyError.
+        Intervals of the state are searched by bisection, as in the run tables.
         """
-        return self.__graph[from_state][symb]
-
-    def delete(self, from_state: int, symb: str, to_state: int):
+        moves = self.__sorted.get(from_state)
+        if moves is None:
+            intervals = sorted(self.__graph[from_state].items())
+            moves = [lo for (lo, _), _ in intervals], [hi for (_, hi), _ in intervals], [end for _, end in intervals]
+            self.__sorted[from_state] = moves
+        i = find(moves[0], moves[1], symb if isinstance(symb, int) else ord(symb))
+        if i < 0:
+            raise KeyError(symb)
+        return moves[2][i]
+
+    def delete(self, from_state: int, symb: Interval, to_state: int):
         """Removes the transition or do nothing."""
+        self.__sorted.pop(from_state, None)
         try:
             self.__graph[from_state][symb] = to_state
         finally:
@@ -48,7 +192,8 @@ class DetTransitions:
 
     def __str__(self) -> str:
         """Returns string representation of the graph."""
-        return self.__graph.__str__()
+        return {state: {label(symb): end for symb, end in moves.items()}
+                for state, moves in self.__graph.items()}.__str__()
 
 
 class Mapping:
@@ -56,23 +201,22 @@ class Mapping:
 
     def __init__(self):
         """Constructor of mapping."""
-        self.to: List[Tuple[bool, Set[int]]] = list()
-        self.inv = dict()
+        self.to: List[Tuple[bool, FrozenSet[int]]] = list()
+        self.inv: Dict[FrozenSet[int], int] = dict()
 
     def map(self, states: Tuple[bool, Set[int]]) -> int:
         """Maps the state to number."""
-        for i in range(0, len(self.to)):
-            if self.to[i] == states:
-                return i
-
-        to_len = len(self.to)
-        self.to.append(states)
-        self.inv[to_len] = states
-        return to_len
-
-    def unmap(self, number: int) -> Tuple[bool, Set[int]]:
+        key = frozenset(states[1])
+        number = self.inv.get(key)
+        if number is None:
+            number = len(self.to)
+            self.to.append((bool(states[0]), key))
+            self.inv[key] = number
+        return number
+
+    def unmap(self, number: int) -> Tuple[bool, FrozenSet[int]]:
         """Returns set that corresponds to the number."""
-        return self.inv[number]
+        return self.to[number]
 
     def finals(self) -> Set[int]:
         """Returns set of number of states that are final."""
@@ -83,50 +227,86 @@ class Mapping:
         return f
 
 
-def group(nd: NDFA, states: Set[int]) -> Dict[chr, Tuple[bool, Set[int]]]:
-    """Returns all symbols and states for which transitions exist."""
-    d: Dict[chr, Tuple[bool, Set[int]]] = dict()
+def group(nd: NDFA, states: Iterable[int]) -> Dict[Interval, Tuple[bool, Set[int]]]:
+    """
+    Returns all intervals of symbols and states for which transitions exist.
+    Overlapping intervals of the states are split into minimal amount of disjoint ones.
+    """
     raw_trans = nd.T.graph()
+    labelled: List[Tuple[Interval, int]] = []
     for state in states:
-        if state not in raw_trans:
-            continue
-        for s, end in raw_trans[state].items():
-            finality = nd.F.intersection(end)
-            try:
-                d[s] = (d[s][0] or finality, d[s][1].union(end))
-            except KeyError:
-                d[s] = (finality, end)
-    return d
-
+        for interval, ends in raw_trans.get(state, dict()).items():
+            for end in ends:
+                labelled.append((interval, end))
 
-def tri_matr_it_gen(m: List[List[int]]):
-    """Iterator through triangled matrix."""
-    for x in range(len(m)):
-        for y in range(len(m[x])):
-            yield x, y
+    d: Dict[Interval, Tuple[bool, Set[int]]] = dict()
+    for interval, ends in split(labelled):
+        d[interval] = (not nd.F.isdisjoint(ends), ends)
+    return d
 
 
-# Helper function that returns equality set for some state
-# using matrix of equality. It writes states that has its equal set
-# but not the initial state of recursion.
-def equality_set(viewed: Set[int], matrix: List[List[int]], state: int) -> Set[int]:
-    """Returns equality set for the state."""
-    equal: Set[int] = {state}
-    for s in range(state, len(matrix)):
-        if matrix[s][state] == 0:
-            viewed.add(s + 1)
-            equal = equal.union(equality_set(viewed, matrix, s + 1))
-    return equal
+def determinize(nd: NDFA, budget: Optional[Budget] = None) -> Tuple[DetTransitions, Mapping]:
+    """
+    Returns transitions of DFA of the NDFA and mapping
+    between states of DFA and sets of states of NDFA.
+    Raises BudgetExceededError if the budget is exceeded.
+    """
+    meter = budget.meter("determinization") if budget is not None else None
+    transitions = 0
+    # Mapping for current automaton.
+    known = Mapping()
+    known.map((len((nd.I.intersection(nd.F))) > 0, nd.I.copy()))
+    # transitions of new automaton
+    new_T = DetTransitions()
+    # States are processed in order of their numbers (breadth-first),
+    # and new sets are numbered in order of sorted intervals,
+    # so the numbering doesn't depend on order of sets inside Python.
+    orig_num = 0
+    while orig_num < len(known.to):
+        # gets set of states itself,
+        origs = known.unmap(orig_num)
+        # receive trasition state sets for symbols,
+        tr = group(nd, origs[1])
+        for symb, ends in tr.items():
+            # encrypt them by mapping (new sets get the next numbers),
+            end_num = known.map(ends)
+            # write as transition in new transition graph.
+            new_T.add(orig_num, symb, end_num)
+        transitions += len(tr)
+        if meter is not None:
+            meter.check(len(known.to), transitions)
+        orig_num += 1
+    return new_T, known
+
+
+def coalesce(moves: List[Tuple[Interval, int]], block: Dict[int, int]) -> List[Tuple[Interval, int]]:
+    """
+    Returns sorted moves where states are replaced by their blocks
+    and neighbour intervals that lead to the same block are merged.
+    """
+    merged: List[Tuple[Interval, int]] = []
+    for (lo, hi), end in moves:
+        end = block[end]
+        if len(merged) > 0 and merged[-1][0][1] + 1 == lo and merged[-1][1] == end:
+            merged[-1] = (merged[-1][0][0], hi), end
+        else:
+            merged.append(((lo, hi), end))
+    return merged
 
 
 class DFA:
-    """The class that implements deterministic state machine."""
+    """
+    The class that implements deterministic state machine.
+
+    The automaton is never changed after construction, so it can be shared
+    between threads; matching position is kept by `DFACursor` objects.
+    """
 
-    def __init__(self, trans: DetTransitions, fins: Set[int]):
-        """Constructor for DFA."""
-        self.__state = 0
+    def __init__(self, trans: DetTransitions, fins: Set[int], alphabet: int = ALPHABET_SIZE):
+        """Constructor for DFA, alphabet is the amount of symbols (code points or bytes)."""
         self.T = trans
         self.F = fins
+        self.alphabet: int = alphabet
         max_state = 1
 
         for [orig, _, end] in self.T:
@@ -136,181 +316,378 @@ class DFA:
                 max_state = end
 
         self.__biggest_state: int = max_state
-
-    def put(self, symb: str) -> bool:
-        """Do one move inside the automaton."""
-        try:
-            self.__state = self.T.get_end(self.__state, symb)
-        except KeyError:
-            self.__state = -1
-            return False
-        return True
-
-    def reset(self) -> None:
-        """Resent current states."""
-        self.__state = 0
-
-    def in_final_state(self) -> bool:
-        """Checks whether the automaton is into one of finite states."""
-        return self.__state in self.F
+        # Tables for matching, they are built on the first use.
+        self.__run: Optional[RunTables] = None
+        self.__bytes: Optional[ByteTables] = None
+
+    def cursor(self) -> 'DFACursor':
+        """Returns new cursor positioned at the initial state."""
+        return DFACursor(self)
+
+    def dead_states(self) -> Set[int]:
+        """Returns states from which no final state can be reached."""
+        reverse: Dict[int, Set[int]] = dict()
+        for orig, _, end in self.T:
+            if end not in reverse:
+                reverse[end] = set()
+            reverse[end].add(orig)
+
+        # Walk back from the finals.
+        alive: Set[int] = set(self.F)
+        queue: List[int] = list(self.F)
+        while len(queue) > 0:
+            for orig in reverse.get(queue.pop(), ()):
+                if orig not in alive:
+                    alive.add(orig)
+                    queue.append(orig)
+
+        return set(range(self.__biggest_state + 1)).difference(alive)
+
+    def universal_states(self) -> Set[int]:
+        """Returns final states after which every continuation is accepted."""
+        graph = self.T.get_graph()
+        # The state is universal if it is final, has transitions
+        # by all symbols and all of them lead to universal states.
+        universal: Set[int] = set()
+        for state in self.F:
+            if sum(hi - lo + 1 for lo, hi in graph.get(state, ())) == self.alphabet:
+                universal.add(state)
+        changes = True
+        while changes:
+            changes = False
+            for state in list(universal):
+                for end in graph[state].values():
+                    if end not in universal:
+                        universal.remove(state)
+                        changes = True
+                        break
+        return universal
+
+    def self_loops(self) -> Dict[int, Tuple[List[int], bool]]:
+        """
+        Returns symbols of self-loops of the states that can be skipped
+        by the matching (not dead, not universal and with not too many
+        loop symbols, see MAX_LOOP_SYMBOLS). If there are too many loop
+        symbols, but few symbols leave the loop, returns them
+        and True as the second element.
+        """
+        skip = self.dead_states().union(self.universal_states())
+        loops: Dict[int, Tuple[List[int], bool]] = dict()
+        for state, moves in self.T.get_graph().items():
+            if state in skip:
+                continue
+            intervals = [interval for interval, end in moves.items() if end == state]
+            size = sum(hi - lo + 1 for lo, hi in intervals)
+            if 0 < size <= MAX_LOOP_SYMBOLS:
+                loops[state] = [c for lo, hi in intervals for c in range(lo, hi + 1)], False
+            elif self.alphabet - size <= MAX_LOOP_SYMBOLS:
+                leaving = negate(intervals, self.alphabet)
+                loops[state] = [c for lo, hi in leaving for c in range(lo, hi + 1)], True
+        return loops
+
+    def __coder(self) -> Tuple[Callable[[int, bool], int], Set[int], Dict[int, Tuple[List[int], bool]]]:
+        """
+        Returns function that codes states for the run tables,
+        dead states and self-loops.
+        """
+        dead = self.dead_states()
+        universal = self.universal_states()
+        loops = self.self_loops()
+        size = self.__biggest_state + 1
+
+        def code(state: int, skip_loops: bool) -> int:
+            if state in dead:
+                return -1
+            if state in universal:
+                return -state - 2
+            if skip_loops and state in loops:
+                return -state - 2 - size
+            return state
+
+        return code, dead, loops
+
+    def run_tables(self) -> RunTables:
+        """
+        Returns tables for fast matching, see `RunTables` for
+        explanation of coding of the states.
+        """
+        if self.__run is not None:
+            return self.__run
+
+        code, dead, loops = self.__coder()
+        size = self.__biggest_state + 1
+        graph = self.T.get_graph()
+        rows: List[Dict[str, int]] = []
+        plain: List[Dict[str, int]] = []
+        wide: List[Optional[WideMoves]] = []
+        for state in range(size):
+            row: Dict[str, int] = dict()
+            plain_row: Dict[str, int] = dict()
+            wide_moves: WideMoves = [], [], []
+            for (lo, hi), end in sorted(graph.get(state, dict()).items()):
+                if end in dead:
+                    continue
+                if hi - lo < EXPAND_LIMIT:
+                    for c in range(lo, hi + 1):
+                        row[chr(c)] = code(end, True)
+                        plain_row[chr(c)] = code(end, False)
+                else:
+                    wide_moves[0].append(lo)
+                    wide_moves[1].append(hi)
+                    wide_moves[2].append(code(end, True))
+            rows.append(row)
+            plain.append(plain_row)
+            wide.append(wide_moves if len(wide_moves[0]) > 0 else None)
+        finals = [state in self.F for state in range(size)]
+        loop_symbols: List[Optional[Tuple[str, bool]]] = [None] * size
+        for state, (symbols, leaving) in loops.items():
+            loop_symbols[state] = "".join(chr(c) for c in symbols), leaving
+
+        # Assignment is atomic, so concurrent builders only waste time.
+        self.__run = RunTables(code(0, True), rows, plain, wide, finals, loop_symbols)
+        return self.__run
+
+    def byte_tables(self) -> ByteTables:
+        """
+        Returns tables for fast matching of bytes, see `ByteTables`.
+        Raises ValueError if the automaton has not byte alphabet (see `automaton.utf8`).
+        """
+        if self.__bytes is not None:
+            return self.__bytes
+        if self.alphabet != BYTE_ALPHABET_SIZE:
+            raise ValueError("The automaton has not byte alphabet.")
+
+        code, dead, loops = self.__coder()
+        size = self.__biggest_state + 1
+        graph = self.T.get_graph()
+        rows: List[List[int]] = []
+        plain: List[List[int]] = []
+        for state in range(size):
+            row = [-1] * BYTE_ALPHABET_SIZE
+            plain_row = [-1] * BYTE_ALPHABET_SIZE
+            for (lo, hi), end in graph.get(state, dict()).items():
+                if end in dead:
+                    continue
+                for byte in range(lo, hi + 1):
+                    row[byte] = code(end, True)
+                    plain_row[byte] = code(end, False)
+            rows.append(row)
+            plain.append(plain_row)
+        finals = [state in self.F for state in range(size)]
+        loop_symbols: List[Optional[Tuple[bytes, bool]]] = [None] * size
+        for state, (symbols, leaving) in loops.items():
+            loop_symbols[state] = bytes(symbols), leaving
+
+        self.__bytes = ByteTables(code(0, True), rows, plain, finals, loop_symbols)
+        return self.__bytes
+
+    def fullmatch(self, w: Union[str, bytes, bytearray, memoryview]) -> bool:
+        """
+        Checks whether the whole word is accepted.
+        Stops as soon as dead or universal state is reached
+        and skips runs of symbols that keep the automaton in the same state.
+        Automata with byte alphabet match bytes-like objects (including mmap),
+        see `automaton.intervals.word_of`.
+        """
+        w = word_of(w, self.alphabet)
+        if not isinstance(w, str):
+            return self.__fullmatch_bytes(w)
+
+        state, rows, plain, wide, finals, loops = self.run_tables()
+        # Codes below are the codes of states with self-loops.
+        bound = -len(rows) - 1
+        misses = LOOP_MISSES
+        it = iter(w)
+        if state < 0:
+            if state >= bound:
+                return state != -1
+            state = -state - 2 + bound + 1
+            skip_run(it, w, 0, loops[state])
+
+        for symb in it:
+            code = rows[state].get(symb, -1)
+            if code == -1 and wide[state] is not None:
+                code = wide_end(wide[state], symb)
+            if code < 0:
+                if code >= bound:
+                    return code != -1
+                code = -code - 2 + bound + 1
+                # Remaining length of the iterator gives current position.
+                if misses > 0 and skip_run(it, w, len(w) - it.__length_hint__(), loops[code]) < LOOP_WINDOW:
+                    misses -= 1
+                    if misses == 0:
+                        # Runs in the word are short, just step through them.
+                        rows = plain
+            state = code
+        return finals[state]
+
+    def __fullmatch_bytes(self, data) -> bool:
+        """Checks whether the whole bytes-like object is accepted, see `fullmatch`."""
+        state, rows, plain, finals, loops = self.byte_tables()
+        # Runs are counted by methods of bytes, other objects are just iterated.
+        skipping = isinstance(data, (bytes, bytearray))
+        if not skipping:
+            data = memoryview(data).cast('B')
+        bound = -len(rows) - 1
+        misses = LOOP_MISSES if skipping else 0
+        it = iter(data)
+        if state < 0:
+            if state >= bound:
+                return state != -1
+            state = -state - 2 + bound + 1
+            if skipping:
+                skip_run(it, data, 0, loops[state])
+
+        for byte in it:
+            code = rows[state][byte]
+            if code < 0:
+                if code >= bound:
+                    return code != -1
+                code = -code - 2 + bound + 1
+                if misses > 0 and skip_run(it, data, len(data) - it.__length_hint__(), loops[code]) < LOOP_WINDOW:
+                    misses -= 1
+                    if misses == 0:
+                        rows = plain
+            state = code
+        return finals[state]
 
     # The class method provides determinization,
     # for further information, please visit /readme.md#determinization.
     @classmethod
-    def from_ndfa(cls, nd: NDFA) -> 'DFA':
-        """Transforms NDFA to DFA."""
-        # Mapping for current automaton.
-        known = Mapping()
-        start_point = known.map((len((nd.I.intersection(nd.F))) > 0, nd.I.copy()))
-        queue: List[int] = [start_point]
-        # Set of numbers of new but processed states.
-        processed: Set[int] = set()
-        # transitions of new automaton
-        new_T = DetTransitions()
-        while True:
-            try:
-                # Get the next state,
-                orig_num = queue.pop()
-                # if we already have worked with it,
-                if orig_num in processed:
-                    # skip it
-                    continue
-                # or add to the set of the processed,
-                processed.add(orig_num)
-
-                # gets set of states itself,
-                origs = known.unmap(orig_num)
-                # receive trasition state sets for symbols,
-                tr = group(nd, origs[1])
-                for symb, ends in tr.items():
-                    # encrypt them by mapping,
-                    end_num = known.map(ends)
-                    # write as transition in new transition graph,
-                    new_T.add(orig_num, symb, end_num)
-                    # adds to the queue.
-                    queue.append(end_num)
-            except IndexError:
-                # The queue is empty.
-                break
+    def from_ndfa(cls, nd: NDFA, budget: Optional[Budget] = None) -> 'DFA':
+        """Transforms NDFA to DFA, raises BudgetExceededError if the budget is exceeded."""
+        new_T, known = determinize(nd, budget)
         # New finals.
         new_F = known.finals()
-        return cls(new_T, new_F)
+        return cls(new_T, new_F, nd.alphabet)
 
     # The method minifies the DFA,
     # for complete explanation of the algorithm
     # please visit /readme.md#minimization.
-    def minimize(self) -> 'DFA':
-        """Minifies the DFA."""
-        # Generation of triangular matrix.
-        # It looks like:
-        # s1\s2 0 1 2 3
-        #   1:  0
-        #   2:  1 1
-        #   3:  0 1 0
-        #   4:  1 0 1 1
-        # It writes 1 if one of the states is final
-        # and other is not(XOR), else 0.
-        m: List[List[int]] = []
-        for s1 in range(1, self.__biggest_state + 1):  # lines
-            m.append(list())
-            for s2 in range(0, s1):
-                if (s1 in self.F) ^ (s2 in self.F):  # columns
-                    m[s1 - 1].append(1)
-                else:
-                    m[s1 - 1].append(0)
-
-        # Receive all symbols that are used.
-        vocabulary: Set[chr] = set()
-        for _, symb, _ in self.T:
-            vocabulary.add(symb)
-
-        # While there is changes in the matrix
-        # check all states that possibly equal
-        # (0 in matrix) and get states
-        # that can be accessible by the same symbol
-        # from the states:
-        # if they are not equal or only one of them has transition
-        # than the possibly equal are not equal and 1 must be written.
-        #
-        # The algorithm finish it work because the matrix
-        # is finite, and at each step it finds all states
-        # that cannot be equal using the information of
-        # the matrix. If there is not conditions that the states
-        # are not equal than they are equal.
-        changes = True
-        while changes:
-            changes = False
-            for s1, s2 in tri_matr_it_gen(m):
-                if m[s1][s2] == 0:
-                    for symb in vocabulary:
-                        exception_count = 0
-                        try:
-                            x_tr = self.T.get_end(s1 + 1, symb)
-                        except KeyError:
-                            exception_count += 1
-                        finally:
-                            try:
-                                y_tr = self.T.get_end(s2, symb)
-                                # States with the same number are
-                                # are always equal.
-                                if exception_count == 0 and x_tr != y_tr:
-                                    # Using triangle matrix, should
-                                    # be careful with indexing.
-                                    if y_tr > x_tr:
-                                        x_tr, y_tr = y_tr, x_tr
-                                    if m[x_tr + 1][y_tr] == 1:
-                                        m[s1][s2] = 1
-                                        changes = True
-                                        break
-                            except KeyError:
-                                exception_count += 1
-                        # One has the transition but another
-                        # hasn't means they are not equal.
-                        if exception_count == 1:
-                            m[s1][s2] = 1
-                            changes = True
-                            break
-
-        viewed: Set[int] = set()
-        eq_sets: List[Set[int]] = []
-        # For all states in the automaton,
-        # receive their equality sets.
-        for state in range(self.__biggest_state + 1):
-            if state not in viewed:
-                eq_sets.append(equality_set(viewed, m, state))
-
-        # Transform rules for merging equal states.
-        trans_rules: Dict[int, int] = dict()
-        for eq_set in eq_sets:
-            # Choose one of the states as main.
-            # 0 is a special state, it is initial,
-            # so equality set that can contain it
-            # must have it as main.
-            # In other cases it doesn't matter.
-            main_state: int = 0
-            if 0 not in eq_set:
-                main_state = eq_set.pop()
-
-            # Mark the state to be replaced by
-            # the main state as well as the main
-            # state itself.
-            trans_rules[main_state] = main_state
-            for state in eq_set:
-                trans_rules[state] = main_state
-
-        # Transform old transitions and finals states
-        # following the rules.
+    def minimize(self, budget: Optional[Budget] = None) -> 'DFA':
+        """Minifies the DFA, raises BudgetExceededError if the budget is exceeded."""
+        return self.merge(self.blocks(budget=budget))
+
+    def blocks(self, classes: Optional[Dict[int, Hashable]] = None, budget: Optional[Budget] = None) -> Dict[int, int]:
+        """
+        Returns numbers of blocks of equal states for every state.
+        At the beginning states are split by classes (finality by default),
+        states of different classes are never equal.
+        The budget limits time of the refinement (amounts are not changed by it).
+        """
+        meter = budget.meter("minimization") if budget is not None else None
+        graph = self.T.get_graph()
+        states = range(self.__biggest_state + 1)
+        moves = {state: sorted(graph.get(state, dict()).items()) for state in states}
+        transitions = sum(len(m) for m in moves.values())
+
+        # At first, states are split into two blocks: finals and others
+        # (or into blocks of the classes).
+        if classes is None:
+            classes = {state: state in self.F for state in states}
+        first: Dict[Hashable, int] = dict()
+        block: Dict[int, int] = {state: first.setdefault(classes.get(state), len(first)) for state in states}
+        count = len(first)
+        while True:
+            # States stay in the same block if they were in the same block
+            # and their moves by the same symbols lead to the same blocks.
+            # Moves are merged by coalesce, so equal moves have equal lists
+            # even if they are split into different intervals.
+            signatures: Dict[Tuple, int] = dict()
+            new_block: Dict[int, int] = dict()
+            for state in states:
+                signature = (block[state], tuple(coalesce(moves[state], block)))
+                new_block[state] = signatures.setdefault(signature, len(signatures))
+                if meter is not None and state % CHECK_PERIOD == 0:
+                    meter.check(len(signatures), transitions)
+            block = new_block
+            # Blocks can be only split, so the same amount means the same blocks.
+            if len(signatures) == count:
+                break
+            count = len(signatures)
+        return block
+
+    def merge(self, block: Dict[int, int]) -> 'DFA':
+        """
+        Returns the automaton where every block of equal states (see `blocks`)
+        becomes one state, block of the state 0 must be 0.
+        """
+        graph = self.T.get_graph()
         new_T = DetTransitions()
-        for orig, symb, end in self.T:
-            new_T.add(trans_rules[orig], symb, trans_rules[end])
-        new_F: Set[int] = set()
-        for state in self.F:
-            new_F.add(trans_rules[state])
-        return DFA(new_T, new_F)
+        merged: Set[int] = set()
+        for state in range(self.__biggest_state + 1):
+            if block[state] in merged:
+                continue
+            merged.add(block[state])
+            for symb, end in coalesce(sorted(graph.get(state, dict()).items()), block):
+                new_T.add(block[state], symb, end)
+        new_F: Set[int] = {block[state] for state in self.F}
+        return DFA(new_T, new_F, self.alphabet)
 
     def __str__(self) -> str:
         """Returns string representation of the automaton."""
-        return "state: {}\n" \
-               "trans: {}\n" \
+        return "trans: {}\n" \
                "final: {}\n" \
-               "bigst: {}".format(self.__state, self.T, self.F, self.__biggest_state)
+               "bigst: {}".format(self.T, self.F, self.__biggest_state)
+
+
+class DFACursor:
+    """
+    Current position of matching inside a DFA.
+
+    Cursor holds only references to the tables of the automaton,
+    so creating one per thread or per task is cheap.
+    """
+
+    __slots__ = ("_start", "_rows", "_wide", "_finals", "state")
+
+    def __init__(self, dfa: DFA):
+        """Constructor for cursor of the automaton."""
+        if dfa.alphabet == BYTE_ALPHABET_SIZE:
+            # Bytes are moved through the dense rows.
+            run = dfa.byte_tables()
+            self._wide: List[Optional[WideMoves]] = [None] * len(run.plain)
+        else:
+            run = dfa.run_tables()
+            self._wide = run.wide
+        self._start: int = run.start
+        self._rows: List[Union[Dict[str, int], List[int]]] = run.plain
+        self._finals: List[bool] = run.finals
+        # State is -1 if the automaton is in dead state.
+        self.state: int = 0
+        self.reset()
+
+    def put(self, symb: Union[str, int]) -> bool:
+        """
+        Do one move inside the automaton by the symbol (or byte).
+        Returns False if no continuation can be accepted anymore.
+        """
+        if self.state == -1:
+            return False
+        row = self._rows[self.state]
+        code = row[symb] if isinstance(row, list) else row.get(symb, -1)
+        if code == -1 and self._wide[self.state] is not None:
+            code = wide_end(self._wide[self.state], symb)
+        self.state = self.__decode(code)
+        return self.state != -1
+
+    def __decode(self, code: int) -> int:
+        """Returns state by its code in the run tables."""
+        if code >= -1:
+            return code
+        if code >= -len(self._rows) - 1:
+            return -code - 2
+        # Initial state and moves by big intervals can be coded as state with self-loops.
+        return -code - 2 - len(self._rows)
+
+    def reset(self) -> None:
+        """Resent current states."""
+        self.state = self.__decode(self._start)
+
+    def in_final_state(self) -> bool:
+        """Checks whether the automaton is into one of finite states."""
+        return self.state != -1 and self._finals[self.state]
+
+    def in_dead_state(self) -> bool:
+        """Checks whether no continuation can be accepted anymore."""
+        return self.state == -1
@@ -0,0 +1,139 @@
+import hashlib
+from collections import deque
+from typing import Deque, Dict, FrozenSet, Hashable, List, Optional, Tuple
+
+from automaton.dfa import DFA, DetTransitions, group
+from automaton.intervals import Interval, refine
+from automaton.ndfa import NDFA
+
+__all__ = ["equivalent", "includes", "canonical", "fingerprint"]
+
+
+class UnionFind:
+    """Disjoint sets of hashable elements with path halving and union by size."""
+
+    def __init__(self):
+        """Constructor of empty disjoint sets."""
+        self.parent: Dict[Hashable, Hashable] = dict()
+        self.size: Dict[Hashable, int] = dict()
+
+    def find(self, x: Hashable) -> Hashable:
+        """Returns representative of the set of x."""
+        if x not in self.parent:
+            self.parent[x] = x
+            self.size[x] = 1
+            return x
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, x: Hashable, y: Hashable) -> bool:
+        """Merges sets of x and y, returns False if they are already merged."""
+        x, y = self.find(x), self.find(y)
+        if x == y:
+            return False
+        if self.size[x] < self.size[y]:
+            x, y = y, x
+        self.parent[y] = x
+        self.size[x] += self.size[y]
+        return True
+
+
+def as_ndfa(automaton) -> NDFA:
+    """Returns NDFA of the automaton."""
+    if isinstance(automaton, DFA):
+        return NDFA.from_dfa(automaton)
+    return automaton
+
+
+def step(nd: NDFA, states: FrozenSet[int]) -> Dict[Interval, FrozenSet[int]]:
+    """Returns all moves of the set of states (one state of the lazy subset construction)."""
+    return {symb: frozenset(ends) for symb, (_, ends) in group(nd, states).items()}
+
+
+def equivalent(a1, a2) -> Tuple[bool, Optional[str]]:
+    """
+    Checks whether two automata (NDFA or DFA) accept the same language.
+    Returns the result and the shortest word that is accepted
+    by only one of them (None if they are equivalent).
+
+    Uses Hopcroft-Karp algorithm: subsets of both automata are built
+    on the fly, pairs of them are merged in disjoint sets, so every
+    class of the sets is explored only once.
+    """
+    machines = as_ndfa(a1), as_ndfa(a2)
+    # States of the machines are tagged by the index of the machine.
+    starts = (0, frozenset(machines[0].I)), (1, frozenset(machines[1].I))
+    classes = UnionFind()
+    classes.union(*starts)
+    queue: Deque[Tuple[Tuple[int, FrozenSet[int]], Tuple[int, FrozenSet[int]], str]] = deque()
+    queue.append((starts[0], starts[1], ""))
+    # Breadth first search finds the shortest counterexample.
+    while len(queue) > 0:
+        x, y, word = queue.popleft()
+        if machines[0].F.isdisjoint(x[1]) != machines[1].F.isdisjoint(y[1]):
+            return False, word
+
+        # Intervals of both automata are split into common ones.
+        for (lo, _), x_ends, y_ends in refine(step(machines[0], x[1]), step(machines[1], y[1])):
+            # Missing move leads to empty set (the sink state).
+            x_end = 0, x_ends or frozenset()
+            y_end = 1, y_ends or frozenset()
+            if classes.union(x_end, y_end):
+                queue.append((x_end, y_end, word + chr(lo)))
+    return True, None
+
+
+def includes(a1, a2) -> Tuple[bool, Optional[str]]:
+    """
+    Checks whether language of a1 includes language of a2.
+    Returns the result and the shortest word accepted by a2 but not by a1.
+    """
+    # L2 is a subset of L1 if and only if L1 equals to union of L1 and L2,
+    # the only words that are different belong to L2 but not to L1.
+    nd1 = as_ndfa(a1)
+    return equivalent(NDFA.by_decision(nd1, as_ndfa(a2)), nd1)
+
+
+def canonical(dfa: DFA) -> DFA:
+    """
+    Returns the same DFA without dead and unreachable states,
+    states are numbered in order of breadth first search
+    by transitions sorted by symbols.
+    Minimal DFAs of equal languages have equal canonical forms.
+    """
+    graph = dfa.T.get_graph()
+    dead = dfa.dead_states()
+    numbers: Dict[int, int] = dict()
+    order: List[int] = []
+    if 0 not in dead:
+        numbers[0] = 0
+        order.append(0)
+
+    trans = DetTransitions()
+    for state in order:
+        for symb, end in sorted(graph.get(state, dict()).items()):
+            if end in dead:
+                continue
+            if end not in numbers:
+                numbers[end] = len(order)
+                order.append(end)
+            trans.add(numbers[state], symb, numbers[end])
+
+    return DFA(trans, {numbers[state] for state in dfa.F if state in numbers}, dfa.alphabet)
+
+
+def fingerprint(dfa: DFA) -> str:
+    """
+    Returns hash of canonical form of the minimized DFA,
+    automata of equal languages have equal fingerprints.
+    Dead and unreachable states are removed before minimization:
+    it tells a missing move from a move into a dead state.
+    """
+    form = canonical(canonical(dfa).minimize())
+    digest = hashlib.sha256()
+    digest.update(repr(sorted(form.F)).encode())
+    for orig, symb, end in form.T:
+        digest.update(repr((orig, symb, end)).encode())
+    return digest.hexdigest()
@@ -0,0 +1,28 @@
+from typing import NamedTuple
+
+__all__ = ["BuildStats", "AutomatonError", "BudgetExceededError"]
+
+
+class BuildStats(NamedTuple):
+    """Statistics of building of the automaton when it was stopped."""
+    # Stage of the building: "determinization" or "minimization".
+    stage: str
+    # Exceeded limit: "states", "transitions", "time" or "cancel".
+    limit: str
+    states: int
+    transitions: int
+    seconds: float
+
+
+class AutomatonError(Exception):
+    """Type for all errors which can happen while building automata."""
+    pass
+
+
+class BudgetExceededError(AutomatonError):
+    """Building of the automaton is stopped by its budget, see `automaton.Budget`."""
+
+    def __init__(self, stats: BuildStats):
+        super().__init__("{} is stopped by {} limit after {} states, {} transitions and {:.3f} seconds.".format(
+            stats.stage.capitalize(), stats.limit, stats.states, stats.transitions, stats.seconds))
+        self.stats: BuildStats = stats
@@ -0,0 +1,128 @@
+import sys
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Set, Tuple, TypeVar, Union
+
+__all__ = ["Interval", "MAX_SYMBOL", "ALPHABET_SIZE", "BYTE_ALPHABET_SIZE", "symbol", "normalize", "negate", "split", "refine",
+           "find", "label", "word_of"]
+
+# Interval of code points of symbols, both ends are included.
+Interval = Tuple[int, int]
+
+# The biggest code point of a symbol.
+MAX_SYMBOL = sys.maxunicode
+# Amount of symbols that can be used in transitions.
+ALPHABET_SIZE = MAX_SYMBOL + 1
+# Amount of symbols of automata that match bytes.
+BYTE_ALPHABET_SIZE = 256
+
+X = TypeVar("X")
+Y = TypeVar("Y")
+
+
+def symbol(s: str) -> Interval:
+    """Returns interval of the single symbol."""
+    return ord(s), ord(s)
+
+
+def normalize(intervals: Iterable[Interval]) -> List[Interval]:
+    """Returns sorted list of intervals where overlapping and adjacent intervals are merged."""
+    merged: List[Interval] = []
+    for lo, hi in sorted(intervals):
+        if len(merged) > 0 and lo <= merged[-1][1] + 1:
+            if hi > merged[-1][1]:
+                merged[-1] = merged[-1][0], hi
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def negate(intervals: Iterable[Interval], size: int = ALPHABET_SIZE) -> List[Interval]:
+    """Returns intervals of all symbols (less than size) that are not in the intervals."""
+    complement: List[Interval] = []
+    start = 0
+    for lo, hi in normalize(intervals):
+        if lo > start:
+            complement.append((start, lo - 1))
+        start = hi + 1
+    if start < size:
+        complement.append((start, size - 1))
+    return complement
+
+
+def split(labelled: Iterable[Tuple[Interval, X]]) -> List[Tuple[Interval, Set[X]]]:
+    """
+    Splits possibly overlapping labelled intervals into disjoint ones.
+    Returns sorted intervals with sets of labels of all intervals
+    that cover them, neighbour intervals with the same labels are merged,
+    so the amount of the intervals is minimal.
+    """
+    # Sweep through the boundaries: interval starts at lo and ends before hi + 1.
+    events: Dict[int, List[Tuple[bool, X]]] = dict()
+    for (lo, hi), x in labelled:
+        events.setdefault(lo, []).append((True, x))
+        events.setdefault(hi + 1, []).append((False, x))
+
+    result: List[Tuple[Interval, Set[X]]] = []
+    active: Dict[X, int] = dict()
+    points = sorted(events)
+    for i in range(len(points) - 1):
+        for opening, x in events[points[i]]:
+            active[x] = active.get(x, 0) + (1 if opening else -1)
+            if active[x] == 0:
+                del active[x]
+        if len(active) == 0:
+            continue
+        labels = set(active)
+        lo, hi = points[i], points[i + 1] - 1
+        if len(result) > 0 and result[-1][0][1] + 1 == lo and result[-1][1] == labels:
+            result[-1] = (result[-1][0][0], hi), labels
+        else:
+            result.append(((lo, hi), labels))
+    return result
+
+
+def refine(a: Dict[Interval, X], b: Dict[Interval, Y]) -> List[Tuple[Interval, Optional[X], Optional[Y]]]:
+    """
+    Splits disjoint intervals of two mappings into common disjoint intervals.
+    Returns the intervals with values of both mappings (None if there is no value).
+    """
+    labelled = [(interval, (0, interval)) for interval in a] + [(interval, (1, interval)) for interval in b]
+    result: List[Tuple[Interval, Optional[X], Optional[Y]]] = []
+    for interval, labels in split(labelled):
+        x: Optional[X] = None
+        y: Optional[Y] = None
+        for side, key in labels:
+            if side == 0:
+                x = a[key]
+            else:
+                y = b[key]
+        result.append((interval, x, y))
+    return result
+
+
+def find(starts: List[int], ends: List[int], code: int) -> int:
+    """Returns index of sorted disjoint interval that contains the code or -1."""
+    i = bisect_right(starts, code) - 1
+    if i >= 0 and code <= ends[i]:
+        return i
+    return -1
+
+
+def word_of(w: Union[str, bytes, bytearray, memoryview], alphabet: int) -> Union[str, bytes, bytearray, memoryview]:
+    """
+    Returns the word in symbols of the alphabet: str is encoded to UTF-8 for byte alphabet,
+    bytes-like objects are words only of byte alphabet (TypeError otherwise).
+    """
+    if isinstance(w, str):
+        return w.encode() if alphabet == BYTE_ALPHABET_SIZE else w
+    if alphabet != BYTE_ALPHABET_SIZE:
+        raise TypeError("Bytes-like objects are matched only by automata with byte alphabet, decode them.")
+    return w
+
+
+def label(interval: Interval) -> str:
+    """Returns readable representation of the interval."""
+    lo, hi = interval
+    if lo == hi:
+        return chr(lo)
+    return "{}-{}".format(chr(lo), chr(hi))
@@ -0,0 +1,160 @@
+import threading
+from typing import Dict, Iterable, List, Tuple, Union
+
+from automaton.bitnfa import BitNFA
+from automaton.intervals import word_of
+
+__all__ = ["LazyDFA", "LazyDFACursor"]
+
+
+class Cache:
+    """States and moves of lazy DFA that were built so far."""
+
+    __slots__ = ("index", "masks", "moves", "finals")
+
+    def __init__(self):
+        # Number of the state by its set of states of NFA.
+        self.index: Dict[int, int] = dict()
+        # Sets of states of NFA of the states.
+        self.masks: List[int] = []
+        # Moves of the states by symbols, -1 is the dead state.
+        self.moves: List[Dict[Union[str, int], int]] = []
+        self.finals: List[bool] = []
+
+
+class LazyDFA:
+    """
+    DFA that is built during matching: states (sets of states of BitNFA)
+    and moves by symbols are added when the word needs them.
+
+    At most max_states states are kept, when there is no place for
+    a new one, all of them are dropped and the building starts again
+    (`flushes` counts it). The automaton can be shared between threads:
+    states, moves and flushes are built under the lock, and a state is
+    published by its move only after its row is complete, so matching
+    reads built moves without the lock.
+    """
+
+    def __init__(self, nfa: BitNFA, max_states: int = 10000):
+        """Constructor of lazy DFA of the simulation of NDFA."""
+        self.nfa: BitNFA = nfa
+        self.alphabet: int = nfa.alphabet
+        self.max_states: int = max_states
+        self.flushes: int = 0
+        self.__lock = threading.Lock()
+        self.__cache: Cache = self.__new_cache()
+
+    def __new_cache(self) -> Cache:
+        """Returns empty cache with the initial state (number 0)."""
+        cache = Cache()
+        self.__state(cache, self.nfa.start)
+        return cache
+
+    def __state(self, cache: Cache, mask: int) -> int:
+        """Returns number of the state of the set of states of NFA (it is called under the lock)."""
+        number = cache.index.get(mask)
+        if number is None:
+            number = len(cache.masks)
+            # The row is complete before the number is used anywhere.
+            cache.masks.append(mask)
+            cache.finals.append(mask & self.nfa.final != 0)
+            cache.moves.append(dict())
+            cache.index[mask] = number
+        return number
+
+    def __flush(self, cache: Cache, state: int) -> Tuple[Cache, int]:
+        """Replaces full cache by the new one, returns it and the state inside it."""
+        if cache is self.__cache:
+            self.flushes += 1
+            self.__cache = self.__new_cache()
+        fresh = self.__cache
+        return fresh, self.__state(fresh, cache.masks[state])
+
+    def __move(self, cache: Cache, state: int, symb: Union[str, int]) -> int:
+        """Builds the move of the state by the symbol."""
+        cls = self.nfa.classify(symb)
+        mask = self.nfa.step(cache.masks[state], cls) if cls >= 0 else 0
+        end = self.__state(cache, mask) if mask != 0 else -1
+        cache.moves[state][symb] = end
+        return end
+
+    def __len__(self) -> int:
+        """Returns amount of states that are built."""
+        return len(self.__cache.masks)
+
+    def cursor(self) -> 'LazyDFACursor':
+        """Returns new cursor positioned at the initial state."""
+        return LazyDFACursor(self)
+
+    def put(self, cache: Cache, state: int, symb: Union[str, int]) -> Tuple[Cache, int]:
+        """
+        Returns cache and the state after the move by the symbol
+        (the cache can be replaced by flush), -1 is the dead state.
+        """
+        end = cache.moves[state].get(symb)
+        if end is None:
+            with self.__lock:
+                # Another thread could build the move while this one waited.
+                end = cache.moves[state].get(symb)
+                if end is None:
+                    if len(cache.masks) >= self.max_states:
+                        cache, state = self.__flush(cache, state)
+                    end = self.__move(cache, state, symb)
+        return cache, end
+
+    def start(self) -> Tuple[Cache, int]:
+        """Returns current cache and the initial state inside it."""
+        return self.__cache, 0
+
+    def fullmatch(self, w: Union[str, bytes, bytearray, memoryview]) -> bool:
+        """
+        Checks whether the whole word is accepted,
+        automata with byte alphabet match bytes-like objects.
+        """
+        w = word_of(w, self.alphabet)
+        symbols: Iterable = w if isinstance(w, str) else memoryview(w).cast('B')
+        cache = self.__cache
+        moves = cache.moves
+        state = 0
+        for symb in symbols:
+            end = moves[state].get(symb)
+            if end is None:
+                cache, end = self.put(cache, state, symb)
+                moves = cache.moves
+            if end < 0:
+                return False
+            state = end
+        return cache.finals[state]
+
+
+class LazyDFACursor:
+    """Current position of matching inside a LazyDFA."""
+
+    __slots__ = ("_automaton", "_cache", "state")
+
+    def __init__(self, lazy: LazyDFA):
+        """Constructor for cursor of the automaton."""
+        self._automaton: LazyDFA = lazy
+        self._cache, self.state = lazy.start()
+
+    def put(self, symb: Union[str, int]) -> bool:
+        """
+        Do one move inside the automaton by the symbol (or byte).
+        Returns False if no continuation can be accepted anymore.
+        """
+        if self.state == -1:
+            return False
+        self._cache, self.state = self._automaton.put(self._cache, self.state, symb)
+        return self.state != -1
+
+    def reset(self) -> None:
+        """Reset current state."""
+        self._cache, self.state = self._automaton.start()
+
+    def in_final_state(self) -> bool:
+        """Checks whether the automaton is into one of finite states."""
+        return self.state != -1 and self._cache.finals[self.state]
+
+    def in_dead_state(self) -> bool:
+        """Checks whether no continuation can be accepted anymore."""
+        return self.state == -1
@@ -1,21 +1,25 @@
-from typing import Dict, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 from automaton import abstract
+from automaton.intervals import Interval, ALPHABET_SIZE, symbol, label, word_of
 
-__all__ = ["NDFA"]
+__all__ = ["NDFA", "NDFACursor"]
 
 
 class NonDetTransitions:
-    """Transitions is a wrapper for a graph of moves over non-deterministic state machine."""
+    """
+    Transitions is a wrapper for a graph of moves over non-deterministic state machine.
+    Moves are labelled by intervals of code points, intervals of one state can overlap.
+    """
 
-    def __init__(self, d: Dict[int, Dict[chr, Set[int]]] = None):
+    def __init__(self, d: Dict[int, Dict[Interval, Set[int]]] = None):
         """Constructor for a non-deterministic transitions graph."""
 
         if d is None:
             d = dict()
         self.__graph = d
 
-    def graph(self) -> Dict[int, Dict[chr, Set[int]]]:
+    def graph(self) -> Dict[int, Dict[Interval, Set[int]]]:
         """Returns inner structure."""
 
         return self.__graph
@@ -28,8 +32,8 @@ class NonDetTransitions:
                 for end_state in end_set:
                     yield origin_state, symb, end_state,
 
-    def add(self, from_state: int, symb: chr, to_state: int) -> None:
-        """Adds transition from the state by symbol to the other state."""
+    def add(self, from_state: int, symb: Interval, to_state: int) -> None:
+        """Adds transition from the state by interval of symbols to the other state."""
 
         if from_state not in self.__graph:
             self.__graph[from_state] = dict()
@@ -39,15 +43,24 @@ class NonDetTransitions:
 
         self.__graph[from_state][symb].add(to_state)
 
-    def get_end_states(self, from_state: int, symb: chr) -> Set[int]:
+    def get_end_states(self, from_state: int, symb: Union[chr, int]) -> Set[int]:
         """
-        Returns end states from some state by some symbol.
+        Returns end states from some state by some symbol (or byte).
         Raise KeyError exception if nothing found.
         """
 
-        return self.__graph[from_state][symb]
-
-    def delete(self, transition: Tuple[int, chr, int]) -> None:
+        code = symb if isinstance(symb, int) else ord(symb)
+        ends: Set[int] = set()
+        found = False
+        for (lo, hi), end_set in self.__graph[from_state].items():
+            if lo <= code <= hi:
+                ends.update(end_set)
+                found = True
+        if not found:
+            raise KeyError(symb)
+        return ends
+
+    def delete(self, transition: Tuple[int, Interval, int]) -> None:
         """Deletes the following transition."""
 
         [from_state, symb, to_state] = transition
@@ -75,7 +88,8 @@ class NonDetTransitions:
 
     def __str__(self) -> str:
         """Returns string representation of the graph."""
-        return self.__graph.__str__()
+        return {state: {label(symb): ends for symb, ends in moves.items()}
+                for state, moves in self.__graph.items()}.__str__()
 
 
 class NDFA:
@@ -84,19 +98,25 @@ class NDFA:
 
     The following realization assumes that every automaton can have multiple
     entry states and can have multiple final states.
+
+    The automaton is never changed after construction, so it can be shared
+    between threads; matching position is kept by `NDFACursor` objects.
     """
 
-    def __init__(self, starts: Set[int], finals: Set[int], trans: NonDetTransitions):
-        """Constructor for non-deterministic finite state machine."""
+    def __init__(self, starts: Set[int], finals: Set[int], trans: NonDetTransitions, alphabet: int = ALPHABET_SIZE):
+        """
+        Constructor for non-deterministic finite state machine,
+        alphabet is the amount of symbols (code points or bytes).
+        """
 
         # Init(entry) states.
         self.I: Set[int] = starts
-        # Current stepping states.
-        self.step_states: Set[int] = starts.copy()
         # Transition graph.
         self.T: NonDetTransitions = trans
         # Final states.
         self.F: Set[int] = finals
+        # Transitions are labelled by symbols less than the alphabet size.
+        self.alphabet: int = alphabet
 
         # The maximum state computing.
         max_state: int = 1
@@ -116,36 +136,29 @@ class NDFA:
 
         self._biggest_state: int = max_state
 
-    def put(self, symb: chr) -> bool:
+    def cursor(self) -> 'NDFACursor':
+        """Returns new cursor positioned at the initial states."""
+        return NDFACursor(self)
+
+    def fullmatch(self, w: Union[str, bytes, bytearray, memoryview]) -> bool:
         """
-        Do one move through the machine graph by the following symbol.
-        The state is split if it moves through a fork with the same symbol transitions.
+        Checks whether the whole word is accepted,
+        automata with byte alphabet match bytes-like objects (see `automaton.intervals.word_of`).
         """
-
-        new_states = set()
-        # Use current states as queue.
-        for state in self.step_states:
-            try:
-                # Gets all states from states by the symbol from the state.
-                for next_state in self.T.get_end_states(state, symb):
-                    new_states.add(next_state)
-            except KeyError:
-                pass
-
-        self.step_states = new_states
-        if len(new_states) > 0:
-            return True
-        return False
-
-    def reset(self) -> None:
-        """Reset current states."""
-
-        self.step_states = self.I.copy()
-
-    def is_final_state(self) -> bool:
-        """Checks whether the automaton is into one of finite states."""
-        # If some current state in final state.
-        return len(self.step_states.intersection(self.F)) > 0
+        graph = self.T.graph()
+        states = self.I
+        w = word_of(w, self.alphabet)
+        codes = map(ord, w) if isinstance(w, str) else memoryview(w).cast('B')
+        for code in codes:
+            new_states = set()
+            for state in states:
+                for (lo, hi), ends in graph.get(state, dict()).items():
+                    if lo <= code <= hi:
+                        new_states.update(ends)
+            if len(new_states) == 0:
+                return False
+            states = new_states
+        return not self.F.isdisjoint(states)
 
     @classmethod
     def shifting(cls, self: 'NDFA', n: int) -> 'NDFA':
@@ -167,7 +180,7 @@ class NDFA:
         for state in self.F:
             new_finals.add(state + n)
 
-        return cls(new_starts, new_finals, new_trans)
+        return cls(new_starts, new_finals, new_trans, self.alphabet)
 
     def __len__(self) -> int:
         """Returns size of the machine(count of states)."""
@@ -179,24 +192,48 @@ class NDFA:
                "    I: {}\n" \
                "    T: {}\n" \
                "    F: {}\n" \
-               "    Biggest state: {}\n" \
-               "    Cur. states: {}\n)".format(self.I, self.T, self.F, self._biggest_state, self.step_states)
+               "    Biggest state: {}\n)".format(self.I, self.T, self.F, self._biggest_state)
 
     def copy(self) -> 'NDFA':
         """Copies the automaton."""
 
-        return NDFA(self.I.copy(), self.F.copy(), self.T.copy())
+        return NDFA(self.I.copy(), self.F.copy(), self.T.copy(), self.alphabet)
+
+    @classmethod
+    def from_dfa(cls, dfa) -> 'NDFA':
+        """Creates the automaton with the same states and transitions as the DFA."""
+
+        trans = NonDetTransitions()
+        for orig, symb, end in dfa.T:
+            trans.add(orig, symb, end)
+        return cls({0}, set(dfa.F), trans, dfa.alphabet)
 
     @classmethod
     def by_value(cls, s: chr) -> 'NDFA':
         """Creates the automaton from the single character."""
 
-        return cls({0}, {1}, NonDetTransitions({0: {s: {1}}}))
+        return cls.by_ranges([symbol(s)])
+
+    @classmethod
+    def by_ranges(cls, ranges: List[Interval]) -> 'NDFA':
+        """Creates the automaton from the class of characters (list of disjoint intervals)."""
+
+        return cls({0}, {1}, NonDetTransitions({0: {r: {1} for r in ranges}}))
+
+    @staticmethod
+    def alphabet_of(m1: 'NDFA', m2: 'NDFA') -> int:
+        """Returns the common alphabet of two automata, raises ValueError if they are different."""
+
+        if m1.alphabet != m2.alphabet:
+            raise ValueError("Automata of different alphabets ({} and {}) can't be combined."
+                             .format(m1.alphabet, m2.alphabet))
+        return m1.alphabet
 
     @classmethod
     def by_concatenation(cls, m1: 'NDFA', m2: 'NDFA') -> 'NDFA':
         """Constructs a new automaton from existing two by concatenation."""
 
+        alphabet = NDFA.alphabet_of(m1, m2)
         # Do the machines not overlapping.
         shift: int = len(m1)
         m2 = NDFA.shifting(m2, shift)
@@ -229,12 +266,13 @@ class NDFA:
 
         # Final transition graph.
         new_trans = m1.T.union(m2.T).union(new_trans)
-        return cls(new_I, new_F, new_trans)
+        return cls(new_I, new_F, new_trans, alphabet)
 
     @classmethod
     def by_decision(cls, m1: 'NDFA', m2: 'NDFA') -> 'NDFA':
         """Constructs a new automaton from existing two by disjunction."""
 
+        alphabet = NDFA.alphabet_of(m1, m2)
         # Do the machines not overlapping.
         shift: int = len(m1)
         m2 = NDFA.shifting(m2, shift)
@@ -244,7 +282,7 @@ class NDFA:
         new_trans = m1.T.union(m2.T)
         new_starts = m1.I.union(m2.I)
         new_finals = m1.F.union(m2.F)
-        return cls(new_starts, new_finals, new_trans)
+        return cls(new_starts, new_finals, new_trans, alphabet)
 
     @classmethod
     def by_closure(cls, m: 'NDFA') -> 'NDFA':
@@ -271,4 +309,103 @@ class NDFA:
 
         F = {final_start}
         I = {final_start}
-        return NDFA(I, F, tr2)
+        return NDFA(I, F, tr2, m.alphabet)
+
+    @classmethod
+    def by_repetition(cls, m: 'NDFA', low: int, high: Optional[int]) -> 'NDFA':
+        """
+        Constructs new automaton that accepts from low to high (None is unlimited)
+        words of the automaton one after another.
+        Copies of the automaton are shifted directly, so the size and time are
+        linear in the amount of copies.
+        """
+
+        # If the automaton accepts empty word, any amount
+        # of its words can be shorter, so low is 0.
+        accepts_empty = len(m.I.intersection(m.F)) > 0
+        if accepts_empty:
+            low = 0
+        if high is None and low == 0:
+            return cls.by_closure(m)
+        if high == 0:
+            return cls({0}, {0}, NonDetTransitions(), m.alphabet)
+
+        copies = low if high is None else high
+        size = len(m)
+        trans = NonDetTransitions()
+        finals: Set[int] = set()
+        for i in range(copies):
+            shift = i * size
+            # The last copy is repeated by itself if there is no upper limit,
+            # other copies are followed by the next copy.
+            next_shift = shift if i == copies - 1 else shift + size
+            for orig, symb, end in m.T:
+                trans.add(orig + shift, symb, end + shift)
+                if end in m.F and (i < copies - 1 or high is None):
+                    for start_state in m.I:
+                        trans.add(orig + shift, symb, start_state + next_shift)
+            # Words of the copies from low-th can be the last ones.
+            # Skipping of copies is not required: all copies are equal,
+            # so a skipped copy is the same as the copy after the last used one.
+            if i + 1 >= low:
+                for state in m.F:
+                    finals.add(state + shift)
+
+        starts = {state for state in m.I}
+        if low == 0 and not accepts_empty:
+            # Additional state for the empty word.
+            starts.add(copies * size)
+            finals.add(copies * size)
+        return NDFA(starts, finals, trans, m.alphabet)
+
+
+class NDFACursor:
+    """
+    Current positions of matching inside a NDFA.
+
+    Cursor holds only references to the tables of the automaton,
+    so creating one per thread or per task is cheap.
+    """
+
+    __slots__ = ("_automaton", "states")
+
+    def __init__(self, nd: NDFA):
+        """Constructor for cursor of the automaton."""
+        self._automaton: NDFA = nd
+        # Current stepping states.
+        self.states: Set[int] = nd.I.copy()
+
+    def put(self, symb: Union[chr, int]) -> bool:
+        """
+        Do one move through the machine graph by the following symbol (or byte).
+        The state is split if it moves through a fork with the same symbol transitions.
+        """
+
+        new_states = set()
+        # Use current states as queue.
+        for state in self.states:
+            try:
+                # Gets all states from states by the symbol from the state.
+                for next_state in self._automaton.T.get_end_states(state, symb):
+                    new_states.add(next_state)
+            except KeyError:
+                pass
+
+        self.states = new_states
+        if len(new_states) > 0:
+            return True
+        return False
+
+    def reset(self) -> None:
+        """Reset current states."""
+
+        self.states = self._automaton.I.copy()
+
+    def in_final_state(self) -> bool:
+        """Checks whether the automaton is into one of finite states."""
+        # If some current state in final state.
+        return len(self.states.intersection(self._automaton.F)) > 0
+
+    def in_dead_state(self) -> bool:
+        """Checks whether no continuation can be accepted anymore."""
+        return len(self.states) == 0
@@ -0,0 +1,190 @@
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+from automaton.budget import Budget
+from automaton.dfa import DFA, DetTransitions, Mapping
+from automaton.intervals import Interval, BYTE_ALPHABET_SIZE, split
+from automaton.ndfa import NDFA
+
+__all__ = ["SharedNDFA", "SharedDFA", "determinize_parallel", "from_ndfa_parallel"]
+
+# Sorted tuple of states of NDFA.
+Subset = Tuple[int, ...]
+# Moves of the subset: disjoint sorted intervals and subsets of their end states.
+Moves = List[Tuple[Interval, Subset]]
+
+
+class SharedNDFA:
+    """
+    Transitions of NDFA in shared memory in compressed sparse row format,
+    so worker processes read them without copying:
+    `[states, rows, offsets (states + 1), lo (rows), hi (rows), end (rows)]`,
+    where rows from offsets[s] to offsets[s + 1] are moves of state s.
+    """
+
+    def __init__(self, name: str, create: bool = False, size: int = 0):
+        """Attaches the shared memory (or creates it of size in bytes)."""
+        self.memory = shared_memory.SharedMemory(name, create, size)
+        self.table = self.memory.buf.cast('q')
+        self.states: int = self.table[0]
+        self.rows: int = self.table[1]
+
+    @classmethod
+    def of(cls, nd: NDFA) -> 'SharedNDFA':
+        """Puts transitions of the NDFA into new shared memory."""
+        graph = nd.T.graph()
+        offsets = array('q', [0])
+        lo, hi, end = array('q'), array('q'), array('q')
+        for state in range(len(nd)):
+            for (a, b), ends in sorted(graph.get(state, dict()).items()):
+                for e in sorted(ends):
+                    lo.append(a)
+                    hi.append(b)
+                    end.append(e)
+            offsets.append(len(end))
+        table = array('q', [len(nd), len(end)]) + offsets + lo + hi + end
+        shared = cls(None, True, len(table) * table.itemsize)
+        shared.memory.buf[:len(table) * table.itemsize] = table.tobytes()
+        shared.states, shared.rows = len(nd), len(end)
+        return shared
+
+    def moves(self, subset: Subset) -> Moves:
+        """Returns moves of the set of states, the same as `automaton.dfa.group`."""
+        table = self.table
+        offsets = 2
+        lo = offsets + self.states + 1
+        hi = lo + self.rows
+        end = hi + self.rows
+        labelled = []
+        for state in subset:
+            for row in range(table[offsets + state], table[offsets + state + 1]):
+                labelled.append(((table[lo + row], table[hi + row]), table[end + row]))
+        return [(interval, tuple(sorted(ends))) for interval, ends in split(labelled)]
+
+    def close(self, unlink: bool = False) -> None:
+        """Detaches the shared memory (and removes it)."""
+        self.table.release()
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
+
+
+# Shared NDFA of the worker process.
+worker_ndfa: Optional[SharedNDFA] = None
+
+
+def attach(name: str) -> None:
+    """Initializer of worker processes."""
+    global worker_ndfa
+    worker_ndfa = SharedNDFA(name)
+
+
+def successors(batch: List[Subset]) -> List[Moves]:
+    """Returns moves of the batch of subsets in the worker process."""
+    return [worker_ndfa.moves(subset) for subset in batch]
+
+
+def determinize_parallel(nd: NDFA, workers: Optional[int] = None, batch_size: int = 64,
+                         budget: Optional[Budget] = None) -> Tuple[DetTransitions, Mapping]:
+    """
+    Parallel version of `automaton.dfa.determinize` with the same numbering of states.
+
+    Subsets are processed level by level: all new subsets of the previous level
+    are sent to the pool of workers (default amount is amount of CPUs) by batches,
+    and their moves are numbered in order of the subsets and their intervals,
+    exactly as the serial version does.
+    """
+    meter = budget.meter("determinization") if budget is not None else None
+    transitions = 0
+    known = Mapping()
+    known.map((len(nd.I.intersection(nd.F)) > 0, nd.I.copy()))
+    new_T = DetTransitions()
+
+    shared = SharedNDFA.of(nd)
+    try:
+        with ProcessPoolExecutor(workers or os.cpu_count(), initializer=attach,
+                                 initargs=(shared.memory.name,)) as pool:
+            level = 0
+            while level < len(known.to):
+                subsets = [tuple(sorted(known.unmap(number)[1])) for number in range(level, len(known.to))]
+                batches = [subsets[i:i + batch_size] for i in range(0, len(subsets), batch_size)]
+                orig = level
+                level = len(known.to)
+                for results in pool.map(successors, batches):
+                    for moves in results:
+                        for interval, ends in moves:
+                            new_T.add(orig, interval, known.map((not nd.F.isdisjoint(ends), set(ends))))
+                        transitions += len(moves)
+                        if meter is not None:
+                            meter.check(len(known.to), transitions)
+                        orig += 1
+    finally:
+        shared.close(unlink=True)
+    return new_T, known
+
+
+def from_ndfa_parallel(nd: NDFA, workers: Optional[int] = None, batch_size: int = 64,
+                       budget: Optional[Budget] = None) -> DFA:
+    """Transforms NDFA to DFA by `determinize_parallel`, the result equals to `DFA.from_ndfa`."""
+    new_T, known = determinize_parallel(nd, workers, batch_size, budget)
+    return DFA(new_T, known.finals(), nd.alphabet)
+
+
+class SharedDFA:
+    """
+    Dense tables of DFA with byte alphabet in shared memory, so every process
+    of a pool matches by the same tables without copying or pickling them:
+    `[states, start, moves (states * 256), finals (states)]`, codes of moves
+    are codes of `automaton.dfa.ByteTables` without self-loops (-1 is dead state,
+    -(u + 2) is universal state u).
+    """
+
+    def __init__(self, name: str, create: bool = False, size: int = 0):
+        """Attaches the shared memory (or creates it of size in bytes)."""
+        self.memory = shared_memory.SharedMemory(name, create, size)
+        self.table = self.memory.buf.cast('q')
+        self.states: int = self.table[0]
+        self.start: int = self.table[1]
+
+    @classmethod
+    def of(cls, dfa: DFA) -> 'SharedDFA':
+        """Puts tables of the DFA into new shared memory, raises ValueError if DFA has not byte alphabet."""
+        tables = dfa.byte_tables()
+        start = tables.start
+        if start < -len(tables.plain) - 1:
+            # Initial state with self-loops is an ordinary state for the plain moves.
+            start = -start - 2 - len(tables.plain)
+        table = array('q', [len(tables.plain), start])
+        for row in tables.plain:
+            table.extend(row)
+        table.extend(int(final) for final in tables.finals)
+        shared = cls(None, True, len(table) * table.itemsize)
+        shared.memory.buf[:len(table) * table.itemsize] = table.tobytes()
+        shared.states, shared.start = len(tables.plain), start
+        return shared
+
+    def fullmatch(self, data) -> bool:
+        """Checks whether the whole bytes-like object is accepted."""
+        table = self.table
+        finals = 2 + self.states * BYTE_ALPHABET_SIZE
+        state = self.start
+        if state < -1:
+            return True
+        if state == -1:
+            return False
+        for byte in data:
+            state = table[2 + state * BYTE_ALPHABET_SIZE + byte]
+            if state < 0:
+                # Dead or universal state.
+                return state != -1
+        return table[finals + state] != 0
+
+    def close(self, unlink: bool = False) -> None:
+        """Detaches the shared memory (and removes it)."""
+        self.table.release()
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
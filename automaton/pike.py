@@ -0,0 +1,145 @@
+from typing import FrozenSet, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from automaton.intervals import Interval, ALPHABET_SIZE, find, word_of
+
+__all__ = ["CHAR", "SPLIT", "JUMP", "SAVE", "MATCH", "LOOP", "Program", "PikeVM"]
+
+# Kinds of instructions of the program:
+# (CHAR, starts, ends, next) moves by symbol from sorted disjoint intervals,
+# (SPLIT, first, second) continues by both instructions, the first is preferred,
+# (JUMP, next), (SAVE, slot, next) saves current position into the slot,
+# (MATCH,) accepts the word,
+# (LOOP, body, next, key, last) is SPLIT of optional iteration of the repetition
+# with the key: after iteration that matched empty word the repetition goes
+# to next, as `re` does (the last iteration is followed by next anyway).
+CHAR, SPLIT, JUMP, SAVE, MATCH, LOOP = range(6)
+
+# Span of the group: start and end positions, the end is not included.
+Span = Tuple[int, int]
+# Instructions reachable without reading a symbol: instruction (CHAR or MATCH)
+# and slots saved on the way to it.
+Closure = List[Tuple[int, Tuple[int, ...]]]
+
+
+class Program(NamedTuple):
+    """Program of Pike VM: instructions, the first instruction and amount of capturing groups."""
+    instructions: List[tuple]
+    start: int
+    groups: int
+
+
+class PikeVM:
+    """
+    Pike VM simulation of NDFA with tags: every thread is an instruction
+    and positions saved by groups (slots 2k and 2k + 1 are start and end
+    of group k). Threads are kept in order of priority and only the first
+    thread comes to each instruction, so the result is the same as
+    backtracking matching of `re` gives, but the word is read once
+    in time linear in its length. Iteration of a loop that matches empty
+    word is made once and leaves the loop, like in `re`: `(b*)+` gives
+    the span `(3, 3)` of the group for "bbb".
+
+    The program is never changed, so the machine can be shared between threads.
+    """
+
+    def __init__(self, program: Program):
+        """Constructor of machine of the program."""
+        self.program: Program = program
+        instructions = program.instructions
+        # Closures of the first instruction and of continuations of CHAR instructions.
+        self.__closures: List[Optional[Closure]] = [None] * len(instructions)
+        self.__closures[program.start] = self.__closure(program.start)
+        for instruction in instructions:
+            if instruction[0] == CHAR and self.__closures[instruction[3]] is None:
+                self.__closures[instruction[3]] = self.__closure(instruction[3])
+
+    def __closure(self, pc: int) -> Closure:
+        """Returns instructions reachable from pc without reading in order of priority."""
+        instructions = self.program.instructions
+        result: Closure = []
+        # Paths and instructions of the result that are reached already.
+        seen = set()
+        reached = set()
+        # Depth-first search, the preferred branch is popped first.
+        # The path also keeps keys of repetitions with iterations started at this position,
+        # coming to the next iteration of such repetition means that the iteration is empty.
+        stack: List[Tuple[int, Tuple[int, ...], FrozenSet[int]]] = [(pc, (), frozenset())]
+        while len(stack) > 0:
+            pc, saves, loops = stack.pop()
+            if (pc, loops) in seen:
+                continue
+            seen.add((pc, loops))
+            instruction = instructions[pc]
+            kind = instruction[0]
+            if kind == SPLIT:
+                stack.append((instruction[2], saves, loops))
+                stack.append((instruction[1], saves, loops))
+            elif kind == LOOP and instruction[3] in loops:
+                stack.append((instruction[2], saves, loops - {instruction[3]}))
+            elif kind == LOOP:
+                stack.append((instruction[2], saves, loops))
+                stack.append((instruction[1], saves, loops if instruction[4] else loops | {instruction[3]}))
+            elif kind == JUMP:
+                stack.append((instruction[1], saves, loops))
+            elif kind == SAVE:
+                stack.append((instruction[2], saves + (instruction[1],), loops))
+            elif pc not in reached:
+                reached.add(pc)
+                result.append((pc, saves))
+        return result
+
+    @staticmethod
+    def __follow(threads: list, seen: set, closure: Closure, slots: tuple, pos: int) -> None:
+        """Adds threads of the closure that are not seen yet with saved positions."""
+        for pc, saves in closure:
+            if pc in seen:
+                continue
+            seen.add(pc)
+            if len(saves) > 0:
+                updated = list(slots)
+                for slot in saves:
+                    updated[slot] = pos
+                threads.append((pc, tuple(updated)))
+            else:
+                threads.append((pc, slots))
+
+    def fullmatch(self, w: Union[str, bytes, bytearray, memoryview]) -> Optional[List[Optional[Span]]]:
+        """
+        Checks whether the whole word is accepted and returns spans of groups
+        (group 0 is the whole word, None for groups that didn't match) or None.
+        Programs are of code points, bytes-like objects raise TypeError (see `automaton.intervals.word_of`).
+        """
+        instructions = self.program.instructions
+        closures = self.__closures
+        follow = self.__follow
+        w = word_of(w, ALPHABET_SIZE)
+        codes: Iterable[int] = map(ord, w)
+
+        threads: list = []
+        follow(threads, set(), closures[self.program.start], (-1,) * (2 * self.program.groups + 2), 0)
+        pos = 0
+        for code in codes:
+            pos += 1
+            new_threads: list = []
+            seen = set()
+            for pc, slots in threads:
+                instruction = instructions[pc]
+                if instruction[0] == CHAR and find(instruction[1], instruction[2], code) >= 0:
+                    follow(new_threads, seen, closures[instruction[3]], slots, pos)
+            if len(new_threads) == 0:
+                return None
+            threads = new_threads
+
+        for pc, slots in threads:
+            if instructions[pc][0] == MATCH:
+                spans: List[Optional[Span]] = [(0, pos)]
+                for group in range(1, self.program.groups + 1):
+                    start, end = slots[2 * group], slots[2 * group + 1]
+                    spans.append((start, end) if start >= 0 and end >= 0 else None)
+                return spans
+        return None
+
+
+def char(intervals: List[Interval], next_pc: int) -> tuple:
+    """Returns CHAR instruction of the sorted disjoint intervals."""
+    return CHAR, [lo for lo, _ in intervals], [hi for _, hi in intervals], next_pc
@@ -0,0 +1,103 @@
+import codecs
+from enum import IntEnum
+
+from automaton.intervals import BYTE_ALPHABET_SIZE
+
+__all__ = ["Status", "StreamMatcher", "match_stream"]
+
+
+class Status(IntEnum):
+    """Status of incremental matching."""
+    # No continuation of the input can be accepted.
+    DEAD = 0
+    # Input is not accepted yet, but can be accepted later.
+    ALIVE = 1
+    # Input read so far is accepted.
+    ACCEPTING = 2
+
+
+class StreamMatcher:
+    """
+    Incremental matcher of a word that arrives by chunks.
+
+    Chunks can be `str`, `bytes`, `bytearray` or `memoryview`,
+    binary chunks are decoded incrementally, so a character
+    can be split between two chunks. Do not mix text and binary
+    chunks inside one word.
+
+    Automata with byte alphabet get binary chunks as they are
+    and text chunks encoded.
+    """
+
+    __slots__ = ("_cursor", "_decoder", "_encoding", "status")
+
+    def __init__(self, automaton, encoding: str = "utf-8"):
+        """Constructor for the matcher of the automaton (DFA or NDFA)."""
+        self._cursor = automaton.cursor()
+        if automaton.alphabet == BYTE_ALPHABET_SIZE:
+            self._decoder = None
+        else:
+            self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._encoding: str = encoding
+        self.status: Status = self.__current()
+
+    def __current(self) -> Status:
+        """Returns status of the cursor."""
+        if self._cursor.in_final_state():
+            return Status.ACCEPTING
+        # The initial state of the empty language is dead already.
+        if self._cursor.in_dead_state():
+            return Status.DEAD
+        return Status.ALIVE
+
+    def feed(self, chunk) -> Status:
+        """Moves the automaton by the chunk and returns new status."""
+        if self.status is Status.DEAD:
+            return self.status
+
+        if self._decoder is None:
+            chunk = chunk.encode(self._encoding) if isinstance(chunk, str) else memoryview(chunk).cast('B')
+        elif not isinstance(chunk, str):
+            chunk = self._decoder.decode(chunk)
+
+        put = self._cursor.put
+        for symb in chunk:
+            if not put(symb):
+                self.status = Status.DEAD
+                return self.status
+
+        self.status = self.__current()
+        return self.status
+
+    def finish(self) -> bool:
+        """
+        Finishes the word and checks whether it is accepted.
+        Raises UnicodeDecodeError if the input ends inside a character.
+        """
+        if self.status is not Status.DEAD and self._decoder is not None:
+            tail = self._decoder.decode(b"", final=True)
+            if len(tail) > 0:
+                self.feed(tail)
+        return self.status is Status.ACCEPTING
+
+    def reset(self) -> None:
+        """Prepares the matcher for the next word."""
+        self._cursor.reset()
+        if self._decoder is not None:
+            self._decoder.reset()
+        self.status = self.__current()
+
+
+async def match_stream(automaton, reader, chunk_size: int = 1 << 16, encoding: str = "utf-8") -> bool:
+    """
+    Reads the word from `asyncio.StreamReader` (or any object with
+    coroutine `read(n)`) and checks whether it is accepted.
+    Stops reading as soon as the automaton is in dead state.
+    """
+    matcher = StreamMatcher(automaton, encoding)
+    while True:
+        chunk = await reader.read(chunk_size)
+        if len(chunk) == 0:
+            return matcher.finish()
+        if matcher.feed(chunk) is Status.DEAD:
+            return False
@@ -0,0 +1,88 @@
+from typing import List
+
+from automaton.intervals import Interval, BYTE_ALPHABET_SIZE
+from automaton.ndfa import NDFA, NonDetTransitions
+
+__all__ = ["utf8_sequences", "to_utf8"]
+
+# The last code points of the encodings of 1, 2 and 3 bytes.
+ENCODING_ENDS = [0x7F, 0x7FF, 0xFFFF]
+# Surrogates can't be encoded in UTF-8.
+SURROGATES = (0xD800, 0xDFFF)
+
+
+def encode(code: int) -> bytes:
+    """Returns UTF-8 encoding of the code point."""
+    return chr(code).encode("utf-8")
+
+
+def utf8_sequences(lo: int, hi: int) -> List[List[Interval]]:
+    """
+    Returns sequences of byte intervals that match UTF-8 encodings
+    of exactly the code points from lo to hi (surrogates are skipped).
+
+    The interval is split until both ends are encoded by the same
+    amount of bytes and all code points between them differ only
+    by complete continuation bytes, then bytes of the ends are zipped.
+    """
+    sequences: List[List[Interval]] = []
+    # The pieces are popped in the order of code points.
+    stack = [(lo, hi)]
+    while len(stack) > 0:
+        lo, hi = stack.pop()
+        if lo > hi:
+            continue
+
+        # Remove surrogates.
+        if lo <= SURROGATES[1] and hi >= SURROGATES[0]:
+            stack.append((SURROGATES[1] + 1, hi))
+            stack.append((lo, SURROGATES[0] - 1))
+            continue
+
+        # Split by the lengths of the encodings.
+        border = next((end for end in ENCODING_ENDS if lo <= end < hi), None)
+        if border is not None:
+            stack.append((border + 1, hi))
+            stack.append((lo, border))
+            continue
+
+        # Split until the tails of the ends are full ranges of continuation bytes.
+        split = False
+        for i in range(1, 4):
+            m = (1 << (6 * i)) - 1
+            if lo & ~m == hi & ~m:
+                continue
+            if lo & m != 0:
+                stack.append(((lo | m) + 1, hi))
+                stack.append((lo, lo | m))
+                split = True
+                break
+            if hi & m != m:
+                stack.append((hi & ~m, hi))
+                stack.append((lo, (hi & ~m) - 1))
+                split = True
+                break
+        if split:
+            continue
+
+        sequences.append(list(zip(encode(lo), encode(hi))))
+    return sequences
+
+
+def to_utf8(nd: NDFA) -> NDFA:
+    """
+    Returns automaton with byte alphabet that accepts UTF-8 encodings
+    of the words accepted by the automaton of code points.
+    Every multi-byte transition gets its own chain of new states.
+    """
+    trans = NonDetTransitions()
+    fresh = len(nd)
+    for orig, (lo, hi), end in nd.T:
+        for sequence in utf8_sequences(lo, hi):
+            state = orig
+            for byte_range in sequence[:-1]:
+                trans.add(state, byte_range, fresh)
+                state = fresh
+                fresh += 1
+            trans.add(state, sequence[-1], end)
+    return NDFA(nd.I.copy(), nd.F.copy(), trans, BYTE_ALPHABET_SIZE)
@@ -0,0 +1,172 @@
+from typing import Dict, Iterable, List, Tuple, Union
+
+from automaton.dfa import DFA, DetTransitions
+from automaton.intervals import ALPHABET_SIZE, word_of
+
+__all__ = ["WordSetBuilder"]
+
+# Finality of the state and its sorted moves: (symbol, end state).
+Signature = Tuple[bool, Tuple[Tuple[int, int], ...]]
+
+
+class WordSetBuilder:
+    """
+    Incremental construction of the minimal acyclic DFA of a set of words
+    (Daciuk, Mihov, Watson and Watson) in any order of the words.
+
+    The automaton is always minimal: every state except the initial one is kept
+    in the register of states by their finality and moves, so equivalent states
+    are the same state. `add` walks the common prefix of the word, clones the part
+    of the path after the first state with several incoming moves (it is shared
+    with other words), appends the rest of the word and then goes back from the
+    end of the word replacing every state of the path with the equivalent state
+    of the register or registering it. Memory is proportional to the minimal
+    automaton, words can be added after `dfa()` as well.
+    """
+
+    def __init__(self, alphabet: int = ALPHABET_SIZE):
+        """Constructor of the builder of the empty set, alphabet is the amount of symbols (code points or bytes)."""
+        self.alphabet: int = alphabet
+        self.__final: List[bool] = [False]
+        self.__moves: List[Dict[int, int]] = [dict()]
+        # Amounts of incoming moves of states.
+        self.__incoming: List[int] = [0]
+        self.__register: Dict[Signature, int] = dict()
+        # Numbers of removed states.
+        self.__free: List[int] = []
+        self.__words: int = 0
+
+    def __codes(self, word: Union[str, bytes, bytearray, memoryview]) -> List[int]:
+        """Returns codes of symbols of the word, see `automaton.intervals.word_of`."""
+        word = word_of(word, self.alphabet)
+        if isinstance(word, str):
+            return [ord(symb) for symb in word]
+        return list(memoryview(word).cast('B'))
+
+    def __signature(self, state: int) -> Signature:
+        return self.__final[state], tuple(sorted(self.__moves[state].items()))
+
+    def __new_state(self, final: bool, moves: Dict[int, int]) -> int:
+        """Returns new state with copy of the moves."""
+        for end in moves.values():
+            self.__incoming[end] += 1
+        if len(self.__free) > 0:
+            state = self.__free.pop()
+            self.__final[state], self.__moves[state], self.__incoming[state] = final, dict(moves), 0
+        else:
+            state = len(self.__final)
+            self.__final.append(final)
+            self.__moves.append(dict(moves))
+            self.__incoming.append(0)
+        return state
+
+    def __redirect(self, orig: int, code: int, end: int) -> None:
+        """Changes the move of the state by the symbol, the previous end state is removed if it becomes unreachable."""
+        previous = self.__moves[orig].get(code)
+        self.__moves[orig][code] = end
+        self.__incoming[end] += 1
+        if previous is not None:
+            self.__incoming[previous] -= 1
+            if self.__incoming[previous] == 0:
+                self.__remove(previous)
+
+    def __unregister(self, state: int) -> None:
+        signature = self.__signature(state)
+        if self.__register.get(signature) == state:
+            del self.__register[signature]
+
+    def __remove(self, state: int) -> None:
+        """Removes unreachable state: its end states are reachable from the equivalent one."""
+        self.__unregister(state)
+        for end in self.__moves[state].values():
+            self.__incoming[end] -= 1
+        self.__moves[state] = dict()
+        self.__free.append(state)
+
+    def add(self, word: Union[str, bytes, bytearray, memoryview]) -> None:
+        """Adds the word to the set."""
+        codes = self.__codes(word)
+        # The common prefix with the automaton.
+        path = [0]
+        for code in codes:
+            end = self.__moves[path[-1]].get(code)
+            if end is None:
+                break
+            path.append(end)
+        if len(path) == len(codes) + 1 and self.__final[path[-1]]:
+            return
+
+        # States of the path change, the shared ones are cloned.
+        cloning = False
+        for i, state in enumerate(path):
+            if i > 0 and self.__incoming[state] > 1:
+                cloning = True
+            if cloning:
+                clone = self.__new_state(self.__final[state], self.__moves[state])
+                self.__redirect(path[i - 1], codes[i - 1], clone)
+                path[i] = clone
+            else:
+                self.__unregister(state)
+
+        # The rest of the word.
+        for code in codes[len(path) - 1:]:
+            end = self.__new_state(False, dict())
+            self.__redirect(path[-1], code, end)
+            path.append(end)
+        self.__final[path[-1]] = True
+        self.__words += 1
+
+        # Replace or register states of the path from the end, the initial state is never registered.
+        for i in range(len(path) - 1, 0, -1):
+            state = path[i]
+            signature = self.__signature(state)
+            equivalent = self.__register.get(signature)
+            if equivalent is None:
+                self.__register[signature] = state
+            elif equivalent != state:
+                self.__redirect(path[i - 1], codes[i - 1], equivalent)
+
+    def update(self, words: Iterable[Union[str, bytes, bytearray, memoryview]]) -> None:
+        """Adds all words of the stream."""
+        for word in words:
+            self.add(word)
+
+    def __contains__(self, word: Union[str, bytes, bytearray, memoryview]) -> bool:
+        state = 0
+        for code in self.__codes(word):
+            state = self.__moves[state].get(code)
+            if state is None:
+                return False
+        return self.__final[state]
+
+    def __len__(self) -> int:
+        """Returns amount of words of the set."""
+        return self.__words
+
+    def states(self) -> int:
+        """Returns amount of states of the minimal automaton."""
+        return len(self.__final) - len(self.__free)
+
+    def dfa(self) -> DFA:
+        """
+        Returns the minimal DFA of the set: states are numbered in order of breadth-first search
+        from the initial state 0, moves by consecutive symbols to the same state are intervals.
+        """
+        number = {0: 0}
+        order = [0]
+        transitions = DetTransitions()
+        for state in order:
+            interval: List[int] = []
+            for code, end in sorted(self.__moves[state].items()):
+                if end not in number:
+                    number[end] = len(order)
+                    order.append(end)
+                if len(interval) > 0 and interval[1] == code - 1 and interval[2] == number[end]:
+                    interval[1] = code
+                    continue
+                if len(interval) > 0:
+                    transitions.add(number[state], (interval[0], interval[1]), interval[2])
+                interval = [code, code, number[end]]
+            if len(interval) > 0:
+                transitions.add(number[state], (interval[0], interval[1]), interval[2])
+        return DFA(transitions, {number[state] for state in order if self.__final[state]}, self.alphabet)
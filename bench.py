@@ -0,0 +1,349 @@
+"""
+Benchmarks of the automata.
+Run `python bench.py` for all benchmarks or `python bench.py <name>...` for some of them.
+"""
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+import ast
+import automaton.dfa
+import bulk
+import engine
+from automaton import DFA, from_ndfa_parallel, count_words, Sampler, WordSetBuilder
+from util import verify_expression, capturing, approximate
+from lexer import Lexer
+from tranlator import translate
+
+
+def best_time(f: Callable[[], object], repeat: int = 5) -> float:
+    """Returns the best time of several runs of f in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compile_dfa(regexp: str, utf8: bool = False) -> DFA:
+    """Builds minimized DFA of the expression (of UTF-8 bytes if utf8 is set)."""
+    return DFA.from_ndfa(translate(ast.parse(regexp), utf8)).minimize()
+
+
+def stepwise(machine, w: str) -> bool:
+    """Matching symbol by symbol with cursor."""
+    cursor = machine.cursor()
+    for symb in w:
+        if not cursor.put(symb):
+            return False
+    return cursor.in_final_state()
+
+
+def bench_fullmatch():
+    """Compares stepwise matching with `fullmatch` on accept and reject heavy workloads."""
+    workloads = [
+        ("accept", "d(a|b)e*(g|k)", ["d" + "ab"[i % 2] + "e" * (i % 200) + "gk"[i % 2] for i in range(2000)]),
+        ("accept", "(ab)*", ["ab" * (i % 300) for i in range(2000)]),
+        ("reject", "d(a|b)e*(g|k)", ["d" + "ab"[i % 2] + "x" + "e" * (i % 200) for i in range(2000)]),
+        ("reject", "(ab)*", ["ab" * (i % 30) + "b" + "ab" * 200 for i in range(2000)]),
+    ]
+    print("{:8} {:16} {:>12} {:>12} {:>8}".format("workload", "regexp", "stepwise, s", "fullmatch, s", "speedup"))
+    for kind, regexp, words in workloads:
+        machine = compile_dfa(regexp)
+        if [stepwise(machine, w) for w in words] != [machine.fullmatch(w) for w in words]:
+            raise Exception("different results", regexp)
+        slow = best_time(lambda: [stepwise(machine, w) for w in words])
+        fast = best_time(lambda: [machine.fullmatch(w) for w in words])
+        print("{:8} {:16} {:12.4f} {:12.4f} {:7.1f}x".format(kind, regexp, slow, fast, slow / fast))
+
+
+def bench_self_loops():
+    """Compares `fullmatch` with and without skipping of self-loop runs on long repetitive words."""
+    workloads = [
+        ("hii*", ["h" + "i" * (1000 + i) for i in range(500)]),
+        ("a*b*c*d", ["a" * (300 + i) + "b" * 500 + "c" * 700 + "d" for i in range(500)]),
+        ("d(a|b)e*(g|k)", ["da" + "e" * (2000 + i) + "g" for i in range(500)]),
+        ("(ab*)*c", [("a" + "b" * 100) * 20 + "c" for _ in range(500)]),
+    ]
+    print("{:16} {:>12} {:>12} {:>8}".format("regexp", "stepping, s", "skipping, s", "speedup"))
+    for regexp, words in workloads:
+        fast_machine = compile_dfa(regexp)
+        # Run tables are built on the first use, so the limit is applied to the new machine only.
+        limit, automaton.dfa.MAX_LOOP_SYMBOLS = automaton.dfa.MAX_LOOP_SYMBOLS, 0
+        try:
+            slow_machine = compile_dfa(regexp)
+            slow_machine.run_tables()
+        finally:
+            automaton.dfa.MAX_LOOP_SYMBOLS = limit
+        if [slow_machine.fullmatch(w) for w in words] != [fast_machine.fullmatch(w) for w in words]:
+            raise Exception("different results", regexp)
+        slow = best_time(lambda: [slow_machine.fullmatch(w) for w in words])
+        fast = best_time(lambda: [fast_machine.fullmatch(w) for w in words])
+        print("{:16} {:12.4f} {:12.4f} {:7.1f}x".format(regexp, slow, fast, slow / fast))
+
+
+def bench_repetition():
+    """Compares size and compile time of `{m,n}` repetitions with expressions written out by hand."""
+    print("{:14} {:>10} {:>10} {:>12} {:>12} {:>10}".format(
+        "regexp", "NDFA size", "DFA size", "repeat, s", "by hand, s", "speedup"))
+    for low, high in [(2, 40), (100, 100), (10, 200), (1000, 1000)]:
+        regexp = "(ab|c){{{},{}}}".format(low, high)
+        # The same language without repetitions: low copies and nested optional ones.
+        by_hand = "(ab|c)" * low + "((ab|c)" * (high - low) + ")?" * (high - low)
+        nd = translate(ast.parse(regexp))
+        machine = DFA.from_ndfa(nd)
+        fast = best_time(lambda: translate(ast.parse(regexp)), repeat=3)
+        name = "{" + str(low) + "," + str(high) + "}"
+        try:
+            slow = best_time(lambda: translate(ast.parse(by_hand)), repeat=1)
+        except RecursionError:
+            # Recursive parser cannot handle so long concatenations.
+            print("{:14} {:10} {:10} {:12.4f} {:>12} {:>10}".format(
+                name, len(nd), len(machine.T.get_graph()) + 1, fast, "fails", "-"))
+            continue
+        print("{:14} {:10} {:10} {:12.4f} {:12.4f} {:9.1f}x".format(
+            name, len(nd), len(machine.T.get_graph()) + 1, fast, slow, slow / fast))
+
+
+def bench_lexer():
+    """Throughput of the lexer on multi-MB inputs compared with `re` based scanner."""
+    rules = [("if", "if"), ("while", "while"), ("ident", "[a-zA-Z_][a-zA-Z0-9_]*"),
+             ("number", "[0-9]+(\\.[0-9]+)?"), ("string", "\"[^\"]*\""),
+             ("op", "[-+*/=<>!]|==|<=|>=|!="), ("space", "[ \t\n]+"), ("punct", "[(){};,]")]
+    started = time.perf_counter()
+    lexer = Lexer(rules)
+    print("compile: {:.4f} s, {} states".format(time.perf_counter() - started, len(lexer.rules)))
+
+    # The same rules for `re`, longer alternatives go first, because `re` takes the first one.
+    scanner = re.compile("|".join("(?P<{}>{})".format(name, regexp) for name, regexp in [
+        ("kw", "(?:if|while)(?![a-zA-Z0-9_])"), ("ident", "[a-zA-Z_][a-zA-Z0-9_]*"),
+        ("number", "[0-9]+(?:\\.[0-9]+)?"), ("string", '"[^"]*"'),
+        ("op", "==|<=|>=|!=|[-+*/=<>!]"), ("space", "[ \t\n]+"), ("punct", "[(){};,]")]))
+
+    random.seed(7)
+    pieces = ["if", "while", "counter", "x_1", "3.14", "42", '"text, with spaces"', "==", "<=", "+",
+              " ", "\n    ", "(", ")", "{", "}", ";", ","]
+    for megabytes in [1, 4]:
+        parts: List[str] = []
+        size = 0
+        while size < megabytes * 2 ** 20:
+            piece = random.choice(pieces)
+            parts.append(piece + " ")
+            size += len(piece) + 1
+        text = "".join(parts)
+
+        count = 0
+        started = time.perf_counter()
+        for _ in lexer.tokenize(text):
+            count += 1
+        ours = time.perf_counter() - started
+
+        started = time.perf_counter()
+        re_count = sum(1 for _ in scanner.finditer(text))
+        theirs = time.perf_counter() - started
+        print("{} MB: {} tokens, lexer {:.2f} s ({:.2f} MB/s, {:.0f} tokens/s), re {:.2f} s ({} tokens)".format(
+            megabytes, count, ours, len(text) / ours / 2 ** 20, count / ours, theirs, re_count))
+
+
+def bench_bytes():
+    """Compares decoding and matching of `str` with matching of UTF-8 bytes by byte automaton."""
+    workloads = [
+        ("(ひらが|かたか)な", ["ひらがな".encode(), "かたかな".encode(), "ひらかな".encode()] * 5000),
+        ("[а-я ]*", [("слово " * (i % 100)).encode() for i in range(2000)]),
+        ("(ab|é)*x", [("ab" * (i % 50) + "é" * (i % 7) + "x").encode() for i in range(5000)]),
+    ]
+    print("{:18} {:>12} {:>12} {:>8}".format("regexp", "decode, s", "bytes, s", "speedup"))
+    for regexp, data in workloads:
+        text_machine = compile_dfa(regexp)
+        byte_machine = compile_dfa(regexp, utf8=True)
+        if [text_machine.fullmatch(b.decode()) for b in data] != [byte_machine.fullmatch(b) for b in data]:
+            raise Exception("different results", regexp)
+        slow = best_time(lambda: [text_machine.fullmatch(b.decode()) for b in data])
+        fast = best_time(lambda: [byte_machine.fullmatch(b) for b in data])
+        print("{:18} {:12.4f} {:12.4f} {:7.1f}x".format(regexp, slow, fast, slow / fast))
+
+
+def bench_engines():
+    """Compares build and matching time of the engines that `engine.compile` can choose."""
+    workloads = [
+        ("d(a|b)e*(g|k)", ["d" + "ab"[i % 2] + "e" * (i % 50) + "gk"[i % 2] for i in range(2000)]),
+        ("(a|b)*a(a|b){12}", ["".join(random.choice("ab") for _ in range(50)) for _ in range(2000)]),
+    ]
+    choices = [("dfa", engine.Limits(time=60.0, states=1 << 20)), ("lazy", engine.Limits(states=256)),
+               ("nfa", engine.Limits(time=0.0))]
+    print("{:18} {:>6} {:>10} {:>10} {}".format("regexp", "engine", "build, s", "match, s", "reason"))
+    for regexp, words in workloads:
+        for name, limits in choices:
+            start = time.perf_counter()
+            compiled = engine.compile(regexp, limits)
+            build = time.perf_counter() - start
+            match = best_time(lambda: [compiled.fullmatch(w) for w in words], repeat=3)
+            print("{:18} {:>6} {:10.4f} {:10.4f} {}".format(
+                regexp, compiled.plan.engine.value, build, match, compiled.plan.reason))
+
+
+def bench_parallel():
+    """Scaling of parallel determinization from 1 to amount of CPUs workers."""
+    nd = translate(ast.parse("(a|b|c)*a(a|b|c){11}"))
+    start = time.perf_counter()
+    serial = DFA.from_ndfa(nd)
+    base = time.perf_counter() - start
+    print("{} DFA states, serial: {:.3f} s".format(len(serial.run_tables().plain), base))
+    print("{:>8} {:>10} {:>8}".format("workers", "time, s", "speedup"))
+    for workers in range(1, (os.cpu_count() or 1) + 1):
+        start = time.perf_counter()
+        parallel = from_ndfa_parallel(nd, workers, batch_size=256)
+        spent = time.perf_counter() - start
+        if list(parallel.T) != list(serial.T):
+            raise Exception("different numbering", workers)
+        print("{:8} {:10.3f} {:7.2f}x".format(workers, spent, base / spent))
+
+
+def bench_bulk():
+    """Compares matching of lines one by one with bulk matching by 1 to amount of CPUs workers."""
+    regexp = "[a-z]*(error|fail)[a-z ]*"
+    words = ["ok", "error", "fail", "warning", "info"]
+    lines = [" ".join(random.choice(words) for _ in range(5)) for _ in range(200000)]
+    machine = compile_dfa(regexp, utf8=True)
+    with tempfile.NamedTemporaryFile("w", suffix=".log") as file:
+        file.write("\n".join(lines))
+        file.flush()
+        with open(file.name, "rb") as data:
+            records = data.read().split(b"\n")
+        start = time.perf_counter()
+        expected = sum(verify_expression(machine, record) for record in records)
+        base = time.perf_counter() - start
+        print("{} records, {} matches, one by one: {:.3f} s".format(len(records), expected, base))
+        print("{:>8} {:>10} {:>8}".format("workers", "time, s", "speedup"))
+        for workers in range(1, (os.cpu_count() or 1) + 1):
+            start = time.perf_counter()
+            result = bulk.bulk_match(machine, [file.name], workers, chunk_size=1 << 20)
+            spent = time.perf_counter() - start
+            if result.matches != expected:
+                raise Exception("different results", workers)
+            print("{:8} {:10.3f} {:7.2f}x".format(workers, spent, base / spent))
+
+
+def bench_groups():
+    """Compares extraction of groups by Pike VM with backtracking `re` on adversarial inputs."""
+    workloads = [
+        ("(a|aa)*b", lambda n: "a" * n),
+        ("(a|a)*b", lambda n: "a" * n),
+        ("(x+x+)+y", lambda n: "x" * n),
+    ]
+    print("{:16} {:>6} {:>10} {:>10}".format("regexp", "length", "re, s", "pike, s"))
+    for regexp, word in workloads:
+        machine = capturing(regexp)
+        backtracking = re.compile(regexp)
+        for n in (8, 14, 20, 24):
+            w = word(n)
+            if machine.fullmatch(w) is not None or backtracking.fullmatch(w) is not None:
+                raise Exception("different results", regexp)
+            slow = best_time(lambda: backtracking.fullmatch(w), repeat=1)
+            fast = best_time(lambda: machine.fullmatch(w), repeat=1)
+            print("{:16} {:6} {:10.4f} {:10.4f}".format(regexp, n, slow, fast))
+    w = "(" + "ab" * 50000 + ")"
+    machine, backtracking = capturing("\\(((ab)*)\\)"), re.compile("\\(((ab)*)\\)")
+    if machine.fullmatch(w) != [backtracking.fullmatch(w).span(i) for i in range(3)]:
+        raise Exception("different groups")
+    print("{:16} {:6} {:10.4f} {:10.4f}".format("\\(((ab)*)\\)", len(w), best_time(lambda: backtracking.fullmatch(w)),
+                                                 best_time(lambda: machine.fullmatch(w))))
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance by dynamic programming."""
+    row = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        previous, row[0] = row[:], i
+        for j, y in enumerate(b, 1):
+            row[j] = min(previous[j] + 1, row[j - 1] + 1, previous[j - 1] + (x != y))
+    return row[-1]
+
+
+def bench_approximate():
+    """Compares approximate matching with edit distance to every identifier."""
+    random.seed(1)
+    letters = "abcdefghijklmnopqrstuvwxyz_"
+    identifiers = ["".join(random.choice(letters) for _ in range(random.randint(4, 12))) for _ in range(200)]
+    inputs = []
+    for _ in range(500):
+        word = list(random.choice(identifiers))
+        word[random.randrange(len(word))] = random.choice(letters)
+        inputs.append("".join(word))
+    for k in (1, 2):
+        matcher = approximate("|".join(identifiers), k)
+        start = time.perf_counter()
+        fast = matcher.distances(inputs)
+        spent = time.perf_counter() - start
+        start = time.perf_counter()
+        slow = []
+        for w in inputs:
+            distance = min(edit_distance(w, identifier) for identifier in identifiers)
+            slow.append(distance if distance <= k else None)
+        base = time.perf_counter() - start
+        if fast != slow:
+            raise Exception("different results", k)
+        print("k={}: edit distances {:.3f} s, automaton {:.3f} s, {:.1f}x".format(k, base, spent, base / spent))
+
+
+def bench_analytics():
+    """Counts words of big lengths and of big automata, samples words uniformly."""
+    print("{:22} {:>6} {:>7} {:>10} {:>8}".format("regexp", "states", "length", "bits", "time, s"))
+    for regexp, lengths in [("(a|b)*a(a|b){2}", (100, 10000, 100000)),
+                            ("[a-z]+@[a-z]+\\.(com|org)", (100, 10000, 100000)),
+                            ("(a|b)*a(a|b){10}", (100, 1000))]:
+        dfa = compile_dfa(regexp)
+        for length in lengths:
+            spent = best_time(lambda: count_words(dfa, length), repeat=1)
+            bits = count_words(dfa, length).bit_length()
+            print("{:22} {:6} {:7} {:10} {:8.4f}".format(regexp, len(dfa.run_tables().finals), length, bits, spent))
+    sampler = Sampler(compile_dfa("[a-z]+@[a-z]+\\.(com|org)"), 64, random.Random(1))
+    spent = best_time(lambda: [sampler.sample(64) for _ in range(1000)], repeat=1)
+    print("1000 samples of length 64: {:.4f} s".format(spent))
+
+
+def bench_wordset():
+    """Compares incremental building of the minimal DFA of words with the alternation of them."""
+    random.seed(1)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = ["".join(random.choice(letters) for _ in range(random.randint(4, 12))) for _ in range(100000)]
+    print("{:>7} {:>12} {:>12} {:>8}".format("words", "regexp, s", "builder, s", "states"))
+    for n in (100, 500, 10000, 100000):
+        builder = WordSetBuilder()
+        spent = best_time(lambda: builder.update(words[:n]), repeat=1)
+        # The recursive parser can't parse much bigger alternations.
+        slow = best_time(lambda: compile_dfa("|".join(words[:n])), repeat=1) if n <= 500 else float("nan")
+        print("{:7} {:12.3f} {:12.3f} {:8}".format(n, slow, spent, builder.states()))
+    builder = WordSetBuilder()
+    print("sorted {} words: {:.3f} s".format(len(words), best_time(lambda: builder.update(sorted(words)), repeat=1)))
+
+
+benchmarks: Dict[str, Callable[[], None]] = {
+    "fullmatch": bench_fullmatch,
+    "self_loops": bench_self_loops,
+    "repetition": bench_repetition,
+    "lexer": bench_lexer,
+    "bytes": bench_bytes,
+    "engines": bench_engines,
+    "parallel": bench_parallel,
+    "bulk": bench_bulk,
+    "groups": bench_groups,
+    "approximate": bench_approximate,
+    "analytics": bench_analytics,
+    "wordset": bench_wordset,
+}
+
+
+def main(names: List[str]):
+    for name in names or benchmarks.keys():
+        print("\n== {} ==".format(name))
+        benchmarks[name]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
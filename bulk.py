@@ -0,0 +1,109 @@
+"""
+Bulk matching of records (lines of files) by one automaton on several processes.
+"""
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+
+import ast
+from automaton import DFA, SharedDFA
+from tranlator import translate
+
+__all__ = ["Shard", "BulkResult", "shards", "match_shard", "bulk_match"]
+
+
+class Shard(NamedTuple):
+    """
+    Byte range of the file. The shard owns the records (lines)
+    that start inside the range, the last one can end after it.
+    """
+    path: str
+    start: int
+    end: int
+
+
+class BulkResult(NamedTuple):
+    """Amount of records, amount of matching records and their offsets by files (if asked)."""
+    records: int
+    matches: int
+    offsets: Dict[str, List[int]]
+
+
+def shards(paths: Iterable[str], chunk_size: int) -> List[Shard]:
+    """Splits the files into shards of chunk_size bytes, empty files are skipped."""
+    result: List[Shard] = []
+    for path in paths:
+        size = os.path.getsize(path)
+        for start in range(0, size, chunk_size):
+            result.append(Shard(path, start, min(start + chunk_size, size)))
+    return result
+
+
+# Tables of the automaton in the worker process.
+worker_dfa: Optional[SharedDFA] = None
+
+
+def attach(name: str) -> None:
+    """Initializer of worker processes."""
+    global worker_dfa
+    worker_dfa = SharedDFA(name)
+
+
+def match_shard(shard: Shard, offsets: bool = False, dfa: Optional[SharedDFA] = None) -> BulkResult:
+    """
+    Matches every record of the shard (without the line break) by the shared DFA
+    (the one of the worker process by default).
+    """
+    dfa = dfa or worker_dfa
+    found: List[int] = []
+    records = 0
+    with open(shard.path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        size = len(data)
+        pos = shard.start
+        # The record that begins before the shard belongs to the previous one.
+        if pos > 0 and data[pos - 1] != ord("\n"):
+            pos = data.find(b"\n", pos)
+            pos = size if pos < 0 else pos + 1
+        while pos < shard.end:
+            end = data.find(b"\n", pos)
+            if end < 0:
+                end = size
+            records += 1
+            if dfa.fullmatch(data[pos:end]):
+                found.append(pos)
+            pos = end + 1
+    return BulkResult(records, len(found), {shard.path: found} if offsets else dict())
+
+
+def bulk_match(automaton: Union[str, DFA], paths: Iterable[str], workers: Optional[int] = None,
+               chunk_size: int = 1 << 24, offsets: bool = False) -> BulkResult:
+    """
+    Matches all lines of the files by the automaton (regular expression or DFA
+    with byte alphabet, see `translate(tree, utf8=True)`) on the pool of workers
+    (default amount is amount of CPUs).
+
+    Tables of the automaton are put into shared memory once, tasks are only
+    shards of the files (see `shards`), so the automaton is never pickled.
+    Returns amounts of records and matches, and offsets of matching records
+    by files if offsets is set.
+    """
+    if isinstance(automaton, str):
+        automaton = DFA.from_ndfa(translate(ast.parse(automaton), utf8=True)).minimize()
+    shared = SharedDFA.of(automaton)
+    records = 0
+    matches = 0
+    found: Dict[str, List[int]] = dict()
+    try:
+        with ProcessPoolExecutor(workers or os.cpu_count(), initializer=attach,
+                                 initargs=(shared.memory.name,)) as pool:
+            tasks = shards(paths, chunk_size)
+            # Results come in order of the shards, so offsets are sorted.
+            for result in pool.map(match_shard, tasks, [offsets] * len(tasks)):
+                records += result.records
+                matches += result.matches
+                for path, positions in result.offsets.items():
+                    found.setdefault(path, []).extend(positions)
+    finally:
+        shared.close(unlink=True)
+    return BulkResult(records, matches, found)
@@ -0,0 +1,166 @@
+import time
+from enum import Enum
+from typing import Dict, NamedTuple, Optional, Set, Tuple, Union
+
+import ast
+from automaton import DFA, NDFA, BitNFA, LazyDFA, Budget, BudgetExceededError
+from automaton.dfa import determinize
+from automaton.intervals import split
+from tranlator import translate
+
+__all__ = ["Engine", "Limits", "Estimate", "Plan", "Compiled", "estimate", "compile"]
+
+# Matching engine.
+Matcher = Union[DFA, LazyDFA, BitNFA]
+
+
+class Engine(Enum):
+    """Kind of automaton used for matching."""
+    # Minimized DFA, the fastest matching, but the build can be exponential.
+    DFA = "dfa"
+    # DFA that is built during matching with limited amount of states.
+    LAZY = "lazy"
+    # Bit-parallel simulation of NDFA, no build at all, but the slowest matching.
+    NFA = "nfa"
+
+
+class Limits(NamedTuple):
+    """Budgets of compilation: seconds for the build and amount of DFA states (memory)."""
+    time: float = 1.0
+    states: int = 10000
+
+
+class Estimate(NamedTuple):
+    """Cost estimate of the pattern."""
+    # States of NDFA.
+    nfa_states: int
+    # Nesting of closures and repetitions without upper limit.
+    star_height: int
+    # Nesting of alternations.
+    alternation_depth: int
+    # States of NDFA with several moves by the same symbol (plus extra initial states).
+    forks: int
+    # States of DFA before minimization (or before the build was stopped), None if they were not counted.
+    dfa_states: Optional[int] = None
+
+
+class Plan(NamedTuple):
+    """The decision of `compile` for monitoring."""
+    engine: Engine
+    reason: str
+    estimate: Estimate
+    # Seconds spent for the build.
+    seconds: float
+
+
+class Compiled:
+    """Pattern compiled by `compile` with the chosen automaton."""
+
+    def __init__(self, pattern: str, matcher: Matcher, plan: Plan):
+        self.pattern: str = pattern
+        self.automaton: Matcher = matcher
+        self.plan: Plan = plan
+        self.alphabet: int = matcher.alphabet
+
+    def cursor(self):
+        """Returns new cursor of the automaton."""
+        return self.automaton.cursor()
+
+    def fullmatch(self, w) -> bool:
+        """Checks whether the whole word is accepted."""
+        return self.automaton.fullmatch(w)
+
+    def __str__(self) -> str:
+        return "Compiled({!r}, {})".format(self.pattern, self.plan.engine.value)
+
+
+def nesting(node: Optional[ast.Node]) -> Tuple[int, int]:
+    """Returns star height and alternation depth of the subtree."""
+    if node is None:
+        return 0, 0
+    stars, alternations = 0, 0
+    for child in node.children():
+        child_stars, child_alternations = nesting(child)
+        stars = max(stars, child_stars)
+        alternations = max(alternations, child_alternations)
+    if len(node.children()) == 0:
+        # Leaves are symbols, even escaped operators like `\*`, `\{` or `\|`.
+        return stars, alternations
+    if node.value() == '*' or (node.value() == '{' and node.bounds()[1] is None):
+        stars += 1
+    elif node.value() == '|':
+        alternations += 1
+    return stars, alternations
+
+
+def live_states(nd: NDFA) -> Set[int]:
+    """Returns states of NDFA from which some final state can be reached."""
+    reverse: Dict[int, Set[int]] = dict()
+    for orig, _, end in nd.T:
+        reverse.setdefault(end, set()).add(orig)
+    live = set(nd.F)
+    stack = list(nd.F)
+    while len(stack) > 0:
+        for orig in reverse.get(stack.pop(), ()):
+            if orig not in live:
+                live.add(orig)
+                stack.append(orig)
+    return live
+
+
+def estimate(tree: ast.AST, nd: NDFA) -> Estimate:
+    """
+    Returns static cost estimate of the pattern by its AST and NDFA.
+    States that can't reach final states (concatenation leaves them) are not forks.
+    """
+    stars, alternations = nesting(tree.root())
+    live = live_states(nd)
+    forks = max(len(nd.I.intersection(live)) - 1, 0)
+    for state, moves in nd.T.graph().items():
+        labelled = [(interval, end) for interval, ends in moves.items() for end in ends if end in live]
+        if state in live and any(len(ends) > 1 for _, ends in split(labelled)):
+            forks += 1
+    return Estimate(len(nd), stars, alternations, forks)
+
+
+def compile(pattern: str, limits: Limits = Limits(), uses: Optional[int] = None, utf8: bool = False) -> Compiled:
+    """
+    Compiles the pattern choosing the automaton by cost estimate:
+    - deterministic NDFA (no forks) is compiled to minimized DFA whatever `uses` is;
+    - if the pattern is going to match less than `uses` words than NDFA
+      has states, building any DFA costs more than the matching itself,
+      so NDFA is simulated;
+    - otherwise DFA is built and minimized within the limits: if there are
+      too many states, lazy DFA keeps at most `limits.states` of them,
+      if time is over during determinization, NDFA is simulated,
+      if time is over during minimization, DFA is not minimized.
+    The decision is available as `plan` of the result.
+    """
+    start = time.monotonic()
+    deadline = start + limits.time
+    tree = ast.parse(pattern)
+    nd = translate(tree, utf8)
+    cost = estimate(tree, nd)
+
+    def done(matcher: Matcher, engine: Engine, reason: str, cost: Estimate) -> Compiled:
+        return Compiled(pattern, matcher, Plan(engine, reason, cost, time.monotonic() - start))
+
+    deterministic = cost.forks == 0 and cost.nfa_states <= limits.states
+    if not deterministic and uses is not None and uses < cost.nfa_states:
+        return done(BitNFA(nd), Engine.NFA, "few uses", cost)
+
+    # Determinization and minimization are stopped by the rest of the limits.
+    try:
+        new_T, known = determinize(nd, Budget(max_states=limits.states, max_time=deadline - time.monotonic()))
+    except BudgetExceededError as e:
+        cost = cost._replace(dfa_states=e.stats.states)
+        if e.stats.limit == "states":
+            return done(LazyDFA(BitNFA(nd), limits.states), Engine.LAZY, "too many DFA states", cost)
+        return done(BitNFA(nd), Engine.NFA, "time is over during determinization", cost)
+    dfa = DFA(new_T, known.finals(), nd.alphabet)
+    cost = cost._replace(dfa_states=len(known.to))
+    reason = "NDFA is deterministic" if deterministic else "DFA fits the limits"
+    try:
+        return done(dfa.minimize(Budget(max_time=deadline - time.monotonic())), Engine.DFA, reason, cost)
+    except BudgetExceededError:
+        return done(dfa, Engine.DFA, "time is over during minimization", cost)
@@ -0,0 +1,368 @@
+"""
+Differential testing of the automata against `re`: random patterns of the supported
+grammar are matched against random words by every engine and by `re.fullmatch`,
+failing cases are shrunk to minimal ones, and throughput of every engine is measured.
+Run `python harness.py [cases] [seed]`.
+"""
+import random
+import re
+import signal
+import sys
+import threading
+import time
+import warnings
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import ast
+from ast.parser import is_postfix
+from automaton import DFA, BitNFA, LazyDFA
+from tranlator import translate
+
+__all__ = ["Case", "Failure", "Report", "ENGINES", "random_case", "comparable", "oracle", "check", "shrink", "run"]
+
+# Symbols of patterns, special ones are escaped.
+LETTERS = "abc"
+SPECIALS = "\\()*|.+?[]{}"
+# Symbols that are escaped inside of the class of characters.
+CLASS_SPECIALS = "\\[]^-"
+# Symbols of words: letters, special symbols and the line break that only `.` and negated classes match.
+SYMBOLS = LETTERS + SPECIALS + "^-\n"
+
+# Seconds of matching of the case by `re`, slower cases are skipped.
+TIMEOUT = 1.0
+
+# Tree of the random pattern: ("char", c), ("class", negated, [(lo, hi)]), ("any",),
+# ("concat", [node]), ("alt", [node]), ("group", node), ("repeat", node, low, high),
+# high is None if it is unlimited.
+Tree = tuple
+
+# Builders of matchers from patterns, every matcher has `fullmatch(w)`.
+ENGINES: Dict[str, Callable[[str], object]] = {
+    "ndfa": lambda pattern: translate(ast.parse(pattern)),
+    "dfa": lambda pattern: DFA.from_ndfa(translate(ast.parse(pattern))),
+    "minimal": lambda pattern: DFA.from_ndfa(translate(ast.parse(pattern))).minimize(),
+    "lazy": lambda pattern: LazyDFA(BitNFA(translate(ast.parse(pattern)))),
+}
+
+
+class Case(NamedTuple):
+    """Pattern and words to match."""
+    pattern: str
+    words: List[str]
+
+
+class Failure(NamedTuple):
+    """Word that the engine matched differently from `re` (actual is None if the engine raised error)."""
+    engine: str
+    pattern: str
+    word: str
+    expected: bool
+    actual: Optional[bool]
+    error: str = ""
+
+
+class Report(NamedTuple):
+    """
+    Amounts of cases, of cases skipped because `re` was too slow and of matched words,
+    shrunk failures and matches per second of every engine and `re`.
+    """
+    cases: int
+    skipped: int
+    matches: int
+    failures: List[Failure]
+    throughput: Dict[str, float]
+
+
+def random_tree(rng: random.Random, depth: int) -> Tree:
+    """Returns random tree of the pattern with nesting up to depth."""
+    kind = rng.choice(["char", "char", "class", "any"] if depth == 0 else
+                      ["char", "class", "concat", "concat", "alt", "group", "repeat", "repeat"])
+    if kind == "char":
+        return "char", rng.choice(LETTERS + SPECIALS if rng.random() < 0.2 else LETTERS)
+    if kind == "class":
+        ranges = []
+        for _ in range(rng.randint(1, 3)):
+            lo = rng.choice(LETTERS + CLASS_SPECIALS)
+            hi = rng.choice([c for c in LETTERS + CLASS_SPECIALS if c >= lo])
+            ranges.append((lo, hi if rng.random() < 0.3 else lo))
+        return "class", rng.random() < 0.3, ranges
+    if kind == "any":
+        return "any",
+    if kind in ("concat", "alt"):
+        return kind, [random_tree(rng, depth - 1) for _ in range(rng.randint(2, 3))]
+    if kind == "group":
+        return "group", random_tree(rng, depth - 1)
+    low, high = rng.choice([(0, None), (1, None), (0, 1), (2, 2), (1, 3), (2, None), (0, 2)])
+    return "repeat", random_tree(rng, depth - 1), low, high
+
+
+def render(tree: Tree) -> str:
+    """Returns the pattern of the tree."""
+    kind = tree[0]
+    if kind == "char":
+        return "\\" + tree[1] if tree[1] in SPECIALS else tree[1]
+    if kind == "class":
+        escape = lambda c: "\\" + c if c in CLASS_SPECIALS else c
+        ranges = "".join(escape(lo) if lo == hi else escape(lo) + "-" + escape(hi) for lo, hi in tree[2])
+        return "[" + ("^" if tree[1] else "") + ranges + "]"
+    if kind == "any":
+        return "."
+    if kind == "concat":
+        return "".join("(" + render(part) + ")" if part[0] == "alt" else render(part) for part in tree[1])
+    if kind == "alt":
+        return "|".join(render(option) for option in tree[1])
+    if kind == "group":
+        return "(" + render(tree[1]) + ")"
+    child = tree[1] if tree[1][0] in ("char", "class", "any", "group") else ("group", tree[1])
+    low, high = tree[2], tree[3]
+    operator = {(0, None): "*", (1, None): "+", (0, 1): "?"}.get((low, high))
+    if operator is None:
+        operator = "{" + str(low) + ("," + str(high) if high != low else "") + "}" if high is not None \
+            else "{" + str(low) + ",}"
+    return render(child) + operator
+
+
+def member(tree: Tree, rng: random.Random) -> str:
+    """Returns random word of the language of the tree."""
+    kind = tree[0]
+    if kind == "char":
+        return tree[1]
+    if kind == "class":
+        inside = [c for c in SYMBOLS if any(lo <= c <= hi for lo, hi in tree[2])]
+        return rng.choice([c for c in SYMBOLS if c not in inside] if tree[1] else inside)
+    if kind == "any":
+        return rng.choice(SYMBOLS)
+    if kind == "concat":
+        return "".join(member(part, rng) for part in tree[1])
+    if kind == "alt":
+        return member(rng.choice(tree[1]), rng)
+    if kind == "group":
+        return member(tree[1], rng)
+    low, high = tree[2], tree[3]
+    return "".join(member(tree[1], rng) for _ in range(rng.randint(low, low + 3 if high is None else high)))
+
+
+def mutate(word: str, rng: random.Random) -> str:
+    """Returns the word with one symbol inserted, deleted or replaced."""
+    pos = rng.randint(0, len(word))
+    edit = rng.choice(["insert", "delete", "replace"] if pos < len(word) else ["insert"])
+    if edit == "insert":
+        return word[:pos] + rng.choice(SYMBOLS) + word[pos:]
+    if edit == "delete":
+        return word[:pos] + word[pos + 1:]
+    return word[:pos] + rng.choice(SYMBOLS) + word[pos + 1:]
+
+
+def random_case(rng: random.Random, words: int = 20, depth: int = 3) -> Case:
+    """
+    Returns random pattern and words: members of its language, their mutations
+    (which are mostly near misses) and random words. Only patterns that `re`
+    reads the same way are returned (see `comparable`).
+    """
+    tree = random_tree(rng, depth)
+    while not comparable(render(tree)):
+        tree = random_tree(rng, depth)
+    result: List[str] = []
+    while len(result) < words:
+        kind = rng.random()
+        if kind < 0.4:
+            result.append(member(tree, rng))
+        elif kind < 0.8:
+            result.append(mutate(member(tree, rng), rng))
+        else:
+            result.append("".join(rng.choice(SYMBOLS) for _ in range(rng.randint(0, 8))))
+    return Case(render(tree), result)
+
+
+def comparable(pattern: str) -> bool:
+    """
+    Checks whether both this grammar and `re` accept the pattern and give it the same meaning:
+    `re` reads stacked quantifiers (`a{2}?`) as lazy or possessive ones and `^`, `$` as anchors.
+    """
+    try:
+        with warnings.catch_warnings():
+            # Nested sets (`[[]`) will change their meaning in the future.
+            warnings.simplefilter("error", FutureWarning)
+            re.compile(pattern)
+        tokens = ast.scan(pattern)
+    except (re.error, FutureWarning, ast.ExpressionError):
+        return False
+    for previous, token in zip([None] + tokens, tokens):
+        if token in ("^", "$") or (is_postfix(previous) and is_postfix(token)):
+            return False
+    return True
+
+
+class Timeout(Exception):
+    """Matching by `re` took too long."""
+    pass
+
+
+def oracle(regex, words: List[str], timeout: Optional[float] = TIMEOUT) -> Optional[List[bool]]:
+    """
+    Returns results of `regex.fullmatch` of the words or None if they took more than timeout seconds:
+    backtracking of `re` is exponential for patterns like `((c?){2,}){2,}`.
+    The timer is a signal, so it works only in the main thread on Unix, otherwise there is no timeout.
+    """
+    if timeout is None or not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        return [regex.fullmatch(w) is not None for w in words]
+
+    def expire(signum, frame):
+        raise Timeout()
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return [regex.fullmatch(w) is not None for w in words]
+    except Timeout:
+        return None
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def check(pattern: str, words: List[str], engines: Dict[str, Callable[[str], object]] = ENGINES,
+          timeout: Optional[float] = TIMEOUT) -> Optional[Failure]:
+    """
+    Returns the first word that some engine matches differently from `re.fullmatch` or None
+    (also if `re` takes more than timeout seconds, see `oracle`).
+    """
+    # `.` matches every symbol, the line break too.
+    expected = oracle(re.compile(pattern, re.DOTALL), words, timeout)
+    if expected is None:
+        return None
+    for name, build in engines.items():
+        try:
+            matcher = build(pattern)
+        except Exception as e:
+            return Failure(name, pattern, words[0] if len(words) > 0 else "", expected[0] if len(words) > 0 else False,
+                           None, "{}: {}".format(type(e).__name__, e))
+        for w, result in zip(words, expected):
+            try:
+                actual = matcher.fullmatch(w)
+            except Exception as e:
+                return Failure(name, pattern, w, result, None, "{}: {}".format(type(e).__name__, e))
+            if actual != result:
+                return Failure(name, pattern, w, result, actual)
+    return None
+
+
+def chunks_removed(text: str) -> List[str]:
+    """Returns the text without one chunk, the biggest chunks go first."""
+    return [text[:start] + text[start + size:] for size in range(len(text), 0, -1)
+            for start in range(0, len(text) - size + 1)]
+
+
+def unwrapped(pattern: str) -> List[str]:
+    """Returns the pattern without one pair of parenthesis (escaped symbols are skipped)."""
+    result: List[str] = []
+    opened: List[int] = []
+    i = 0
+    while i < len(pattern):
+        if pattern[i] == "\\":
+            i += 1
+        elif pattern[i] == "(":
+            opened.append(i)
+        elif pattern[i] == ")" and len(opened) > 0:
+            start = opened.pop()
+            result.append(pattern[:start] + pattern[start + 1:i] + pattern[i + 1:])
+        i += 1
+    return result
+
+
+def shrink(failure: Failure, engines: Dict[str, Callable[[str], object]] = ENGINES,
+           timeout: Optional[float] = TIMEOUT) -> Failure:
+    """
+    Returns minimal failure of the same engine and kind (wrong result or error):
+    parenthesis and chunks of the pattern and chunks of the word are removed and
+    symbols of the word are simplified while the engine still fails. A smaller pattern often fails only
+    on a smaller word, so every smaller pattern is checked with all smaller words.
+    """
+    engine = {failure.engine: engines[failure.engine]}
+    changed = True
+    while changed:
+        changed = False
+        words = [failure.word] + chunks_removed(failure.word)
+        words += [failure.word[:pos] + LETTERS[0] + failure.word[pos + 1:]
+                  for pos, symb in enumerate(failure.word) if symb != LETTERS[0]]
+        patterns = unwrapped(failure.pattern) + chunks_removed(failure.pattern)
+        for pattern, tried in [(pattern, words) for pattern in patterns] + \
+                              [(failure.pattern, words[1:])]:
+            if len(tried) == 0 or not comparable(pattern):
+                continue
+            smaller = check(pattern, tried, engine, timeout)
+            if smaller is not None and (smaller.actual is None) == (failure.actual is None) \
+                    and (smaller.pattern, smaller.word) != (failure.pattern, failure.word):
+                failure, changed = smaller, True
+                break
+    return failure
+
+
+def first_failure(engine: str, case: Case, expected: List[bool], actual: Optional[List[bool]],
+                  error: str) -> Failure:
+    """Returns unshrunk failure: the first word that the engine matched differently (the first word if it raised error)."""
+    for i, w in enumerate(case.words):
+        if actual is None or actual[i] != expected[i]:
+            return Failure(engine, case.pattern, w, expected[i], None if actual is None else actual[i], error)
+    return Failure(engine, case.pattern, "", False, None, error)
+
+
+def run(cases: int = 200, words: int = 20, seed: int = 0,
+        engines: Dict[str, Callable[[str], object]] = ENGINES, timeout: Optional[float] = TIMEOUT) -> Report:
+    """
+    Checks random cases by every engine against `re`, shrinks failures
+    (at most one failure of every engine for the case) and measures
+    matches per second of every engine and of `re` (builds are not counted).
+    Cases that `re` matches longer than timeout seconds are skipped.
+    """
+    rng = random.Random(seed)
+    failures: List[Failure] = []
+    seconds = {name: 0.0 for name in ["re"] + list(engines)}
+    matches = 0
+    skipped = 0
+    for _ in range(cases):
+        case = random_case(rng, words)
+        regex = re.compile(case.pattern, re.DOTALL)
+        start = time.perf_counter()
+        expected = oracle(regex, case.words, timeout)
+        if expected is None:
+            skipped += 1
+            continue
+        seconds["re"] += time.perf_counter() - start
+        matches += len(case.words)
+        for name, build in engines.items():
+            error = ""
+            try:
+                matcher = build(case.pattern)
+                start = time.perf_counter()
+                actual = [matcher.fullmatch(w) for w in case.words]
+                seconds[name] += time.perf_counter() - start
+            except Exception as e:
+                actual, error = None, "{}: {}".format(type(e).__name__, e)
+            if actual != expected:
+                # The failure is reproduced by `check` to be shrunk, unless `re` is too slow this time.
+                failure = check(case.pattern, case.words, {name: build}, timeout)
+                if failure is None:
+                    failures.append(first_failure(name, case, expected, actual, error))
+                else:
+                    failures.append(shrink(failure, engines, timeout))
+    throughput = {name: matches / spent if spent > 0 else float("inf") for name, spent in seconds.items()}
+    return Report(cases, skipped, matches, failures, throughput)
+
+
+def main(args: List[str]):
+    cases = int(args[0]) if len(args) > 0 else 200
+    seed = int(args[1]) if len(args) > 1 else 0
+    report = run(cases, seed=seed)
+    print("{} cases ({} skipped, `re` was too slow), {} matches".format(report.cases, report.skipped, report.matches))
+    print("{:8} {:>12} {:>8}".format("engine", "matches/s", "vs re"))
+    for name, rate in report.throughput.items():
+        print("{:8} {:12.0f} {:8.2f}".format(name, rate, rate / report.throughput["re"]))
+    for failure in report.failures:
+        print("{} fails {!r} on {!r}: expected {}, got {} {}".format(
+            failure.engine, failure.pattern, failure.word, failure.expected, failure.actual, failure.error))
+    sys.exit(1 if len(report.failures) > 0 else 0)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
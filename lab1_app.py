@@ -1,8 +1,6 @@
 from typing import List
 
-import ast
-from automaton import DFA
-from tranlator import translate
+import engine
 from util import verify_expression
 
 
@@ -38,16 +36,16 @@ def testing(filename: str, debug: bool) -> bool:
             print(true_exprs, false_exprs, test_case)
             raise AppError("There must be at least one expression.")
 
-        tree = ast.parse(regexp)
-        # machine = translate(tree) #NDFA
-        machine = DFA.from_ndfa(translate(tree)).minimize()
+        # The automaton is chosen by cost of the expression, see `engine.compile`.
+        machine = engine.compile(regexp, uses=len(true_exprs) + len(false_exprs))
 
         print()
         print(regexp)
         if debug:
             print(test_case)
             print("Automata:")
-            print(machine)
+            print(machine.plan)
+            print(machine.automaton)
         if len(true_exprs) > 0:
             print("Should be True:")
 
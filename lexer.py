@@ -0,0 +1,118 @@
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import ast
+from automaton import DFA, NDFA
+from automaton.dfa import determinize, wide_end
+from automaton.ndfa import NonDetTransitions
+from tranlator import translate
+
+__all__ = ["LexerError", "Lexer"]
+
+# Token is its kind (name of the rule), start and end positions in the text.
+Token = Tuple[str, int, int]
+
+
+class LexerError(Exception):
+    """Type for errors of lexer rules and tokenizing."""
+
+    def __init__(self, message: str, position: Optional[int] = None):
+        super().__init__(message)
+        self.position = position
+
+
+class Lexer:
+    """
+    Lexer built from ordered rules `(token_name, regexp)` as one minimized DFA.
+    Final states of the DFA carry the first rule that accepts the word.
+
+    Tokenizing looks for the longest token (and for the first rule
+    if several rules accept it) and returns to the last final state
+    if the automaton stops before the end of the text. Pairs (state, position)
+    after the last final state lead to no token, they are remembered and never
+    explored again (Reps), so tokenizing is linear in the length of the text.
+    """
+
+    def __init__(self, rules: List[Tuple[str, str]]):
+        """Constructor of lexer, raises LexerError if some rule accepts empty word."""
+        self.names: List[str] = [name for name, _ in rules]
+
+        # All automata are joined as alternatives, final states remember their rules.
+        starts: Set[int] = set()
+        finals: Dict[int, int] = dict()
+        trans = NonDetTransitions()
+        shift = 0
+        for i, (name, regexp) in enumerate(rules):
+            nd = translate(ast.parse(regexp))
+            if len(nd.I.intersection(nd.F)) > 0:
+                raise LexerError("Rule {} accepts empty word.".format(name))
+            for orig, symb, end in nd.T:
+                trans.add(orig + shift, symb, end + shift)
+            starts.update(state + shift for state in nd.I)
+            for state in nd.F:
+                finals[state + shift] = i
+            shift += len(nd)
+        joined = NDFA(starts, set(finals), trans)
+
+        # The state of DFA gets the first rule of its set of states,
+        # states of different rules are never merged by minimization.
+        det_T, known = determinize(joined)
+        rule_of: Dict[int, int] = dict()
+        for number in range(len(known.to)):
+            rule_of[number] = min((finals[state] for state in known.unmap(number)[1] if state in finals),
+                                  default=-1)
+        dfa = DFA(det_T, known.finals())
+        block = dfa.blocks(rule_of)
+        self.dfa: DFA = dfa.merge(block)
+        self.rules: List[int] = [-1] * len(self.dfa.run_tables().plain)
+        for state, rule in rule_of.items():
+            self.rules[block[state]] = rule
+
+    def tokenize(self, text: str, pos: int = 0) -> Iterator[Token]:
+        """
+        Lazily yields tokens `(kind, start, end)` of the text from the position.
+        Raises LexerError if no rule accepts a token at some position.
+        """
+        start, _, rows, wide, _, _ = self.dfa.run_tables()
+        rules = self.rules
+        names = self.names
+        size = len(rows)
+
+        def decode(code: int) -> int:
+            """Returns state by its code in the run tables."""
+            if code >= -size - 1:
+                return -code - 2
+            return -code - 2 - size
+
+        first = decode(start) if start < -1 else start
+        end = len(text)
+        # Pairs (state, position) from which no final state is reachable.
+        failed: Set[Tuple[int, int]] = set()
+        while pos < end:
+            state = first
+            last_end = -1
+            last_rule = -1
+            i = pos
+            # Pairs after the last final state of this token.
+            tail: List[Tuple[int, int]] = []
+            while i < end:
+                code = rows[state].get(text[i], -1)
+                if code == -1 and wide[state] is not None:
+                    code = wide_end(wide[state], text[i])
+                if code < -1:
+                    code = decode(code)
+                state = code
+                i += 1
+                if state < 0 or (state, i) in failed:
+                    break
+                if rules[state] >= 0:
+                    last_end = i
+                    last_rule = rules[state]
+                    tail = []
+                else:
+                    tail.append((state, i))
+            failed.update(tail)
+
+            if last_end < 0:
+                raise LexerError("No token at position {}.".format(pos), pos)
+            yield names[last_rule], pos, last_end
+            pos = last_end
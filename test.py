@@ -1,9 +1,30 @@
+import itertools
+import mmap
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple, List
 
 import ast
-from automaton.dfa import DFA
+from automaton import Budget, BudgetExceededError, from_ndfa_parallel, count_words, count_words_upto, \
+    is_empty, is_finite, is_universal, Sampler, WordSetBuilder, BitNFA, LazyDFA, ApproximateMatcher
+from automaton.analytics import useful_states
+from automaton.bitnfa import KNOWN_LIMIT
+from automaton.intervals import BYTE_ALPHABET_SIZE
+from automaton.ndfa import NDFA
+from automaton.dfa import DFA, DetTransitions
+from automaton.stream import Status, StreamMatcher, match_stream
 from tranlator import translate
-from util import verify_expression
+from lexer import Lexer, LexerError
+from engine import compile, Engine, Limits
+from bulk import bulk_match
+import harness
+from harness import check, comparable, oracle, random_case, run as run_harness, shrink
+from util import verify_expression, equivalent, includes, fingerprint, deduplicate, capturing, approximate
 
 expressions = ["d(a|b)e*(g|k)", "aa*a|(aa*)***", "**", "a|", "*|a", "(acd(a)*|a)|(ab*|a)",
                "a|a|a|(ab)*", "(a)*(a)*", "aa", "(ab)*", "a|(a*b*)*", "((ab)"]
@@ -22,7 +43,13 @@ tests: List[Test] = [("", ["", "a", "b"], [True, False, False]),
                      ("d(a|b)e*(g|k)", ["daeg", "dbk", "dbeeek", "dcegk", ], [True, True, True, False]),
                      ("a(b|a|c)d*", ["abdddd", "aadd", "acd", "add", "ab", "acc"],
                       [True, True, True, False, True, False]),
-                     ("(ab*)(ab)*", ["a", "aab", "abbab", "abb", "abaa"], [True, True, True, True, False])]
+                     ("(ab*)(ab)*", ["a", "aab", "abbab", "abb", "abaa"], [True, True, True, True, False]),
+                     ("[a-c][^a-c]", ["ax", "cな", "bb", "da"], [True, True, False, False]),
+                     ("a.c|[\\]\\-]", ["abc", "a.c", "]", "-", "ac", "\\"], [True, True, True, True, False, False]),
+                     ("(x|y)[xy]*", ["x", "yxyx", "", "xz"], [True, True, False, False]),
+                     ("(ab)+c?", ["ab", "ababc", "c", "abcc"], [True, True, False, False]),
+                     ("x{2,3}(y|z){2}", ["xxyz", "xxxzz", "xyy", "xxxxyy", "xxy"], [True, True, False, False, False]),
+                     ("(a*b?){2,}|c{,1}", ["", "c", "cc", "aabab", "bbb"], [True, True, False, True, True])]
 
 passed = True
 for expr in tests:
@@ -34,5 +61,454 @@ for expr in tests:
             raise Exception(expr[0], "{}".format(tree), i, expr[1][i], expr[2][i],
                             "{}".format(machine),
                             "{}".format(tree))
+
+# One compiled automaton is shared by all workers, every call uses its own cursor.
+for expr in tests:
+    shared = [translate(ast.parse(expr[0])), DFA.from_ndfa(translate(ast.parse(expr[0]))).minimize()]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for machine in shared:
+            words = expr[1] * 50
+            results = list(pool.map(lambda w: verify_expression(machine, w), words))
+            if results != expr[2] * 50:
+                raise Exception(expr[0], "concurrent matching", results)
+
+# Lazy DFA builds states during matching: threads share it with its flushes.
+switch_interval = sys.getswitchinterval()
+sys.setswitchinterval(1e-6)
+nd = translate(ast.parse("(a|b)*a(a|b){7}"))
+lazy, machine = LazyDFA(BitNFA(nd), 50), DFA.from_ndfa(nd).minimize()
+rng = random.Random(1)
+words = ["".join(rng.choice("ab") for _ in range(rng.randint(5, 40))) for _ in range(2000)]
+with ThreadPoolExecutor(max_workers=8) as pool:
+    results = list(pool.map(lazy.fullmatch, words))
+sys.setswitchinterval(switch_interval)
+if results != [machine.fullmatch(w) for w in words] or lazy.flushes == 0:
+    raise Exception("lazy", "concurrent matching")
+# Classes of symbols are remembered for a bounded amount of symbols, even for wide classes.
+wide_nfa = BitNFA(translate(ast.parse(".*")))
+if not wide_nfa.fullmatch("".join(chr(code) for code in range(0x4e00, 0x4e00 + 3 * KNOWN_LIMIT))) \
+        or len(wide_nfa._BitNFA__known) > KNOWN_LIMIT:
+    raise Exception("bitnfa", "known classes")
+
+# Classes of characters are stored as intervals, so wide classes keep automata small.
+machine = DFA.from_ndfa(translate(ast.parse("[ぁ-ゖ]*な|.[^a]"))).minimize()
+if sum(len(moves) for moves in machine.T.get_graph().values()) > 24:
+    raise Exception("classes", machine)
+# Moves are found among intervals of the state by bisection, added moves are found too.
+wide = DetTransitions({0: {(code, code): code % 7 + 1 for code in range(0, 2000, 2)}})
+if wide.get_end(0, "\u0064") != 100 % 7 + 1 or wide.get_end(0, 1998) != 1998 % 7 + 1:
+    raise Exception("get_end", "bisection")
+wide.add(0, (1, 1), 9)
+if wide.get_end(0, "\u0001") != 9:
+    raise Exception("get_end", "added")
+for symb in ("\u0003", 5000):
+    try:
+        wide.get_end(0, symb)
+        raise Exception("get_end", symb)
+    except KeyError:
+        pass
+for expr in ["[]", "[a", "[z-a]", "[\\a]", "a{", "a{2,1}", "a{x}", "+a"]:
+    try:
+        ast.parse(expr)
+        raise Exception(expr, "must be an error")
+    except ast.ExpressionError:
+        pass
+
+# Repetitions copy automaton of the subtree, so the size is linear in the amount of them.
+if len(translate(ast.parse("(ab|c){2,400}"))) > 400 * 6 or len(translate(ast.parse("x{1000}"))) > 2001:
+    raise Exception("repetition size")
+
+# State 2 cannot reach the final one, so the word is rejected before its end.
+machine = DFA(DetTransitions({0: {(97, 97): 1, (98, 98): 2}, 2: {(98, 98): 2}}), {1})
+if machine.dead_states() != {2} or machine.fullmatch("b" * 1000) or not machine.fullmatch("a"):
+    raise Exception("dead states", machine.dead_states())
+cursor = machine.cursor()
+if cursor.put('b') or cursor.put('b') or cursor.in_final_state():
+    raise Exception("dead states", "cursor")
+
+# Runs of self-loop symbols are skipped, results must be the same as of stepping.
+for regexp in ["hii*", "a*b*c*d", "d(a|b)e*(g|k)", "(ab*)*c", "b(a*|b*|c*)"]:
+    nd = translate(ast.parse(regexp))
+    machine = DFA.from_ndfa(nd)
+    for run in ["", "a", "b", "c", "e", "i"]:
+        for n in [0, 1, 15, 16, 17, 100, 1000]:
+            for w in ["h" + run * n, "hi" + run * n + "x", "d" + run * n, "da" + run * n + "g", "b" + run * n,
+                      "a" + run * n + "bcd", "ab" + run * n + "ac", run * n + "d"]:
+                if machine.fullmatch(w) != nd.fullmatch(w) or verify_expression(machine, w) != nd.fullmatch(w):
+                    raise Exception(regexp, "self-loops", w)
+
+# Equivalence and inclusion with the shortest counterexamples.
+language_tests = [("(a*b*)*", "(a|b)*", (True, None), (True, None)),
+                  ("a(ba)*", "(ab)*a", (True, None), (True, None)),
+                  ("ab*", "ab", (False, "a"), (True, None)),
+                  ("ab", "ab*", (False, "a"), (False, "a")),
+                  ("(ab)*", "ab|abab", (False, ""), (True, None)),
+                  ("(ひらが|かたか)な", "ひらがな|かたかな", (True, None), (True, None))]
+for p1, p2, equal, included in language_tests:
+    if equivalent(p1, p2) != equal or includes(p1, p2) != included:
+        raise Exception(p1, p2, equivalent(p1, p2), includes(p1, p2))
+    if (fingerprint(p1) == fingerprint(p2)) != equal[0]:
+        raise Exception(p1, p2, "fingerprint")
+# Explicit moves into a dead state don't change the fingerprint.
+by_hand = DetTransitions()
+for orig, symb, end in [(0, "x", 1), (0, "y", 2), (1, "a", 3), (2, "a", 3), (2, "c", 4)]:
+    by_hand.add(orig, (ord(symb), ord(symb)), end)
+by_hand = DFA(by_hand, {3})
+if not equivalent(by_hand, "[xy]a")[0] or fingerprint(by_hand) != fingerprint("[xy]a"):
+    raise Exception("fingerprint", "dead state")
+if deduplicate(["(a*b*)*", "(a|b)*", "a|b", "b|a", "a(ba)*", "(ab)*a"]) != ["(a*b*)*", "a|b", "a(ba)*"]:
+    raise Exception("deduplicate")
+
+# Longest tokens, the first rule wins for equal tokens, backtracking to the last final state.
+lexer = Lexer([("if", "if"), ("ident", "[a-z]+"), ("num", "[0-9]+(\\.[0-9]+)?"), ("ws", " +"), ("op", "[=<]|<=")])
+text = "if ifx <= 3.x"
+tokens = []
+try:
+    for kind, begin, end in lexer.tokenize(text):
+        tokens.append((kind, text[begin:end]))
+except LexerError as e:
+    tokens.append(e.position)
+if tokens != [("if", "if"), ("ws", " "), ("ident", "ifx"), ("ws", " "), ("op", "<="), ("ws", " "), ("num", "3"), 11]:
+    raise Exception("lexer", tokens)
+try:
+    list(Lexer([("a", "a*")]).tokenize("a"))
+    raise Exception("lexer", "empty rule")
+except LexerError:
+    pass
+# Maximal munch is linear: failed scans to the end of the text are not repeated.
+munch = Lexer([("a", "a"), ("ab", "a*b")])
+seconds = []
+for n in (2000, 16000):
+    best = float("inf")
+    for _ in range(3):
+        began = time.perf_counter()
+        if sum(1 for _ in munch.tokenize("a" * n)) != n:
+            raise Exception("lexer", "munch", n)
+        best = min(best, time.perf_counter() - began)
+    seconds.append(best)
+if seconds[1] > 24 * seconds[0]:
+    raise Exception("lexer", "quadratic", seconds)
+
+# Incremental matching by chunks of different types.
+machine = DFA.from_ndfa(translate(ast.parse("(ひらが|かたか)な"))).minimize()
+matcher = StreamMatcher(machine)
+encoded = "ひらがな".encode()
+if matcher.feed(encoded[:4]) is not Status.ALIVE or matcher.feed(memoryview(encoded)[4:7]) is not Status.ALIVE:
+    raise Exception("stream", "alive")
+if matcher.feed(bytearray(encoded[7:])) is not Status.ACCEPTING or not matcher.finish():
+    raise Exception("stream", "accepting")
+matcher.reset()
+if matcher.feed("ひx") is not Status.DEAD or matcher.feed("らがな") is not Status.DEAD or matcher.finish():
+    raise Exception("stream", "dead")
+for empty in (DFA(DetTransitions(), set()), DFA(DetTransitions(), set(), BYTE_ALPHABET_SIZE)):
+    matcher = StreamMatcher(empty)
+    if matcher.status is not Status.DEAD or matcher.feed("a") is not Status.DEAD or matcher.finish():
+        raise Exception("stream", "empty language")
+    matcher.reset()
+    if matcher.status is not Status.DEAD:
+        raise Exception("stream", "empty language", "reset")
+
+
+# Automata of UTF-8 bytes.
+tree = ast.parse("(ひらが|かたか)な")
+byte_machines = [translate(tree, utf8=True), DFA.from_ndfa(translate(tree, utf8=True)).minimize()]
+with tempfile.TemporaryFile() as file:
+    file.write(encoded)
+    file.flush()
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for machine in byte_machines:
+            for data in (encoded, bytearray(encoded), memoryview(encoded), mapped):
+                if not machine.fullmatch(data):
+                    raise Exception("utf8", "accept", data)
+            for data in (encoded[:-1], encoded + b"x", "ひらがな".encode("utf-16")):
+                if machine.fullmatch(data):
+                    raise Exception("utf8", "reject", data)
+machine = byte_machines[1]
+if not DFA.from_ndfa(translate(ast.parse("[^a]*"), utf8=True)).fullmatch("ёё".encode() * 100):
+    raise Exception("utf8", "self-loops")
+if DFA.from_ndfa(translate(ast.parse("."), utf8=True)).fullmatch(b"\xed\xa0\x80"):
+    raise Exception("utf8", "surrogate")
+matcher = StreamMatcher(machine)
+if matcher.feed(encoded[:4]) is not Status.ALIVE or matcher.feed(encoded[4:6] + "が".encode()) is not Status.ALIVE \
+        or matcher.feed("な") is not Status.ACCEPTING or not matcher.finish():
+    raise Exception("utf8", "stream")
+
+
+# One rule of input types for all engines: str is encoded to UTF-8 for byte automata,
+# bytes are an error for automata of code points.
+for utf8 in (False, True):
+    nd = translate(ast.parse("ひら*|é"), utf8)
+    for machine in [nd, BitNFA(nd), LazyDFA(BitNFA(nd)), DFA.from_ndfa(nd), DFA.from_ndfa(nd).minimize()]:
+        if not machine.fullmatch("ひらら") or not machine.fullmatch("é") or machine.fullmatch("ひ".encode().decode("latin-1")):
+            raise Exception("input types", utf8, type(machine).__name__)
+        try:
+            accepted = machine.fullmatch("é".encode())
+        except TypeError:
+            accepted = None
+        if accepted is not (True if utf8 else None):
+            raise Exception("input types", "bytes", utf8, type(machine).__name__, accepted)
+
+
+# Choice of the engine and fallbacks.
+blowup = "(a|b)*a(a|b){8}"
+words = ["ab" * i + "a" + "ba" * 4 for i in range(20)] + ["ab" * i + "b" + "ab" * 4 for i in range(20)]
+choices = [(Limits(), None, Engine.DFA), (Limits(states=30), None, Engine.LAZY),
+           (Limits(time=0.0), None, Engine.NFA), (Limits(), 1, Engine.NFA)]
+for limits, uses, kind in choices:
+    compiled = compile(blowup, limits, uses)
+    if compiled.plan.engine is not kind:
+        raise Exception("compile", limits, uses, compiled.plan)
+    if [compiled.fullmatch(w) for w in words] != [w[-9] == "a" for w in words]:
+        raise Exception("compile", "fullmatch", compiled.plan)
+if compile("abc", uses=1).plan.reason != "NDFA is deterministic" or compile("abc").plan.estimate.dfa_states != 4:
+    raise Exception("compile", "deterministic", compile("abc").plan)
+# Escaped operators are symbols, not operators.
+for pattern, word in [("a\\{b", "a{b"), ("a\\*", "a*"), ("x\\|y", "x|y"), ("\\{2\\}|\\*+", "{2}")]:
+    escaped = compile(pattern)
+    if not escaped.fullmatch(word) or escaped.fullmatch(word[:-1]) or escaped.plan.estimate.star_height > 1:
+        raise Exception("compile", "escaped", pattern)
+# The time limit holds for deterministic NDFA too.
+if compile("abc", Limits(time=0.0)).plan.engine is not Engine.NFA:
+    raise Exception("compile", "deterministic", "time")
+if not compile(blowup, Limits(states=30), utf8=True).fullmatch(b"aaaaaaaaa"):
+    raise Exception("compile", "utf8")
+
+
+# Budgets of determinization and minimization.
+cancelled = threading.Event()
+cancelled.set()
+nd = translate(ast.parse("(a|b)*a(a|b){12}"))
+budgets = [(Budget(max_states=100), "states"), (Budget(max_transitions=100), "transitions"),
+           (Budget(max_time=0.0), "time"), (Budget(cancel=cancelled), "cancel")]
+for budget, limit in budgets:
+    try:
+        DFA.from_ndfa(nd, budget)
+        raise Exception("budget", limit)
+    except BudgetExceededError as e:
+        if e.stats.limit != limit or e.stats.stage != "determinization" or e.stats.states == 0:
+            raise Exception("budget", limit, e.stats)
+if not DFA.from_ndfa(nd, Budget(max_states=10000, max_time=60.0, cancel=threading.Event())).minimize().fullmatch("a" * 13):
+    raise Exception("budget", "fits")
+try:
+    DFA.from_ndfa(nd).minimize(Budget(cancel=cancelled))
+    raise Exception("budget", "minimization")
+except BudgetExceededError as e:
+    if e.stats.stage != "minimization":
+        raise Exception("budget", "minimization", e.stats)
+
+
+# Parallel determinization numbers states as the serial one.
+for expression in ["(a|b)*a(a|b){6}", "(ひらが|かたか)な|[а-я]*x", "d(a|b)e*(g|k)"]:
+    nd = translate(ast.parse(expression))
+    serial, parallel = DFA.from_ndfa(nd), from_ndfa_parallel(nd, 2, batch_size=8)
+    if list(serial.T) != list(parallel.T) or serial.F != parallel.F:
+        raise Exception("parallel", expression)
+try:
+    from_ndfa_parallel(translate(ast.parse("(a|b)*a(a|b){12}")), 2, budget=Budget(max_states=100))
+    raise Exception("parallel", "budget")
+except BudgetExceededError:
+    pass
+
+
+# Bulk matching of lines of files, shards split lines.
+with tempfile.TemporaryDirectory() as directory:
+    paths = [directory + "/first.txt", directory + "/second.txt", directory + "/empty.txt"]
+    contents = ["ひらがな\nabd\n\nかたかな\nx", "d\n" * 10, ""]
+    for path, content in zip(paths, contents):
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+    for chunk_size in (1, 5, 1 << 20):
+        result = bulk_match("(ひらが|かたか)な|[a-c]*d", paths, workers=2, chunk_size=chunk_size, offsets=True)
+        if result.records != 15 or result.matches != 13 or result.offsets[paths[0]] != [0, 13, 18]:
+            raise Exception("bulk", chunk_size, result)
+
+
+# Capturing groups.
+groups_cases = [("(a|ab)(c|bcd)(d*)", "abcd", [(0, 4), (0, 1), (1, 4), (4, 4)]),
+                ("((ひら|かた)(が|か))な", "かたかな", [(0, 4), (0, 3), (0, 2), (2, 3)]),
+                ("(a)*b(c)?", "aab", [(0, 3), (1, 2), None]),
+                ("(a{2})+\\((b+)\\)", "aaaa(bb)", [(0, 8), (2, 4), (5, 7)]),
+                ("x(a|b)*", "xy", None)]
+for expression, word, spans in groups_cases:
+    machine = capturing(expression)
+    if machine.fullmatch(word) != spans:
+        raise Exception("groups", expression, word, machine.fullmatch(word))
+    if verify_expression(compile(expression), word) != (spans is not None):
+        raise Exception("groups", "language", expression)
+# Iteration that matches empty word is made once and ends the repetition, as in `re`.
+for expression, word, spans in [("(b*)+", "bbb", [(0, 3), (3, 3)]), ("(a?){2,}", "aa", [(0, 2), (2, 2)]),
+                                ("(a|b*)*", "ab", [(0, 2), (2, 2)]), ("(b*|(a)){0,2}", "a", [(0, 1), (1, 1), (0, 1)]),
+                                ("((b*|(a)){0,2})*", "aa", [(0, 2), (2, 2), (2, 2), (1, 2)])]:
+    match = re.fullmatch(expression, word)
+    if capturing(expression).fullmatch(word) != spans or [match.span(i) for i in range(len(spans))] != spans:
+        raise Exception("groups", "empty iteration", expression, capturing(expression).fullmatch(word))
+if capturing("(a|aa)*b").fullmatch("a" * 1000) is not None:
+    raise Exception("groups", "adversarial")
+
+
+# Approximate matching.
+identifiers = approximate("colou?r|[a-z_][a-z0-9_]*_id", 2)
+distances = identifiers.distances(["color", "colr", "clour", "kolour", "user_id", "user-id", "userid", "x"])
+if distances != [0, 1, 1, 1, 0, 1, 1, None]:
+    raise Exception("approximate", distances)
+if approximate("ab*c", 0).distance("abbbc") != 0 or approximate("ab*c", 1).distance("axxc") is not None:
+    raise Exception("approximate", "k")
+# Threads share the matcher with its flushes, even the smallest cache makes progress.
+switch_interval = sys.getswitchinterval()
+sys.setswitchinterval(1e-6)
+nd = translate(ast.parse("colou?r|[a-z_][a-z0-9_]*_id"))
+rng = random.Random(2)
+words = ["".join(rng.choice("colur_id-") for _ in range(rng.randint(0, 12))) for _ in range(2000)]
+expected = ApproximateMatcher(nd, 2).distances(words)
+for max_states in (2, 20):
+    shared = ApproximateMatcher(nd, 2, max_states)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(shared.distance, words))
+    if results != expected or shared.flushes == 0:
+        raise Exception("approximate", "concurrent matching", max_states)
+sys.setswitchinterval(switch_interval)
+try:
+    ApproximateMatcher(nd, 2, 1)
+    raise Exception("approximate", "max_states")
+except ValueError:
+    pass
+
+# Analytics of languages.
+counted = DFA.from_ndfa(translate(ast.parse("(a|b)*a(a|b){2}"))).minimize()
+if count_words_upto(counted, 5) != [0, 0, 0, 4, 8, 16] or count_words(counted, 2000) != 2 ** 1999:
+    raise Exception("count_words", count_words_upto(counted, 5))
+if count_words(DFA.from_ndfa(translate(ast.parse("[a-c]x|yy"))), 2) != 4:
+    raise Exception("count_words", "intervals")
+for regexp, empty, finite, universal in [("ab|c", False, True, False), ("a*", False, False, False),
+                                         (".*", False, False, True), ("[^\u0000-\U0010ffff]", True, True, False)]:
+    analysed = DFA.from_ndfa(translate(ast.parse(regexp))).minimize()
+    if (is_empty(analysed), is_finite(analysed), is_universal(analysed)) != (empty, finite, universal):
+        raise Exception("analytics", regexp)
+sampler = Sampler(counted, 6, random.Random(1))
+samples = [sampler.sample(5) for _ in range(1600)]
+if set(samples) != set(w for w in map("".join, itertools.product("ab", repeat=5)) if w[2] == "a") \
+        or max(samples.count(w) for w in set(samples)) > 150:
+    raise Exception("Sampler", len(set(samples)))
+if Sampler(DFA.from_ndfa(translate(ast.parse("な"), utf8=True)), 3).sample_upto() != "な".encode():
+    raise Exception("Sampler", "bytes")
+
+
+# Minimal DFA of the set of words built incrementally.
+for words in [["car", "cart", "cat", "dog", "dot", "do", ""], ["tap", "taps", "top", "tops", "stop", "stops"],
+              ["b", "ab", "aab", "ac", "c", "aac", "bb"]]:
+    for order in [words, sorted(words), list(reversed(words))]:
+        builder = WordSetBuilder()
+        builder.update(order + order[:2])
+        built = builder.dfa()
+        words_pattern = "|".join(w for w in words if w != "")
+        reference = DFA.from_ndfa(translate(ast.parse("(" + words_pattern + ")?" if "" in words else words_pattern)))
+        reference = reference.minimize()
+        if not equivalent(built, reference)[0] or len(builder) != len(words) or \
+                builder.states() != len(useful_states(reference)):
+            raise Exception("WordSetBuilder", order, builder.states())
+        if not all(w in builder for w in words) or "ca" in builder:
+            raise Exception("WordSetBuilder", "contains")
+builder = WordSetBuilder(BYTE_ALPHABET_SIZE)
+builder.update(["ひらがな", b"kana"])
+if not builder.dfa().fullmatch("ひらがな".encode()) or builder.dfa().fullmatch(b"kan"):
+    raise Exception("WordSetBuilder", "bytes")
+# Words combined with the regular expression, more words are added after the build.
+builder = WordSetBuilder()
+builder.update(["user", "group"])
+numbered = NDFA.by_concatenation(NDFA.from_dfa(builder.dfa()), translate(ast.parse("_[0-9]+")))
+builder.add("role")
+if not equivalent(numbered, "(user|group)_[0-9]+")[0] or not equivalent(builder.dfa(), "user|group|role")[0]:
+    raise Exception("WordSetBuilder", "combined")
+# Builders keep the byte alphabet of their operands and reject different alphabets.
+builder = WordSetBuilder(BYTE_ALPHABET_SIZE)
+builder.update(["user", "group"])
+words = NDFA.from_dfa(builder.dfa())
+digits = translate(ast.parse("_[0-9]"), utf8=True)
+for built, accepted, rejected in [(NDFA.by_concatenation(words, digits), b"user_1", b"user"),
+                                  (NDFA.by_decision(words, digits), b"_1", b"user_1"),
+                                  (NDFA.by_closure(digits), b"_1_2", b"_"),
+                                  (NDFA.by_repetition(digits, 2, 3), b"_1_2", b"_1"),
+                                  (NDFA.by_repetition(digits, 0, 0), b"", b"_1")]:
+    if built.alphabet != BYTE_ALPHABET_SIZE or not built.fullmatch(accepted) or built.fullmatch(rejected):
+        raise Exception("builders", "bytes", accepted)
+for combine in (NDFA.by_concatenation, NDFA.by_decision):
+    try:
+        combine(words, translate(ast.parse("_[0-9]")))
+        raise Exception("builders", "alphabets")
+    except ValueError:
+        pass
+
+# Differential testing against `re`.
+report = run_harness(40, seed=1)
+if len(report.failures) > 0 or report.matches == 0:
+    raise Exception("harness", report.failures)
+
+
+class BrokenDFA:
+    """Matcher that rejects words with `bb`."""
+
+    def __init__(self, pattern: str):
+        self.dfa = DFA.from_ndfa(translate(ast.parse(pattern)))
+
+    def fullmatch(self, w: str) -> bool:
+        return self.dfa.fullmatch(w) and "bb" not in w
+
+
+failure = check("(a|(b|c)+)*c", ["abcbbac"], {"broken": BrokenDFA})
+if failure is None or shrink(failure, {"broken": BrokenDFA})[1:3] not in [("b+", "bb"), ("b*", "bb"), ("(b)+", "bb")]:
+    raise Exception("shrink", failure and shrink(failure, {"broken": BrokenDFA}))
+if oracle(re.compile("((c?){2,}){2,}"), ["c" * 30 + "x"], timeout=0.1) is not None:
+    raise Exception("oracle", "timeout")
+# Generated patterns mean the same for `re`, failures stay unshrunk if `re` is too slow to check them again.
+rng = random.Random(3)
+if not all(comparable(random_case(rng).pattern) for _ in range(300)):
+    raise Exception("harness", "comparable")
+harness_oracle = harness.oracle
+
+
+def first_oracle(*args):
+    """Oracle that is too slow after the first call."""
+    harness.oracle = lambda *_: None
+    return harness_oracle(*args)
+
+
+harness.oracle = first_oracle
+try:
+    report = run_harness(1, engines={"broken": BrokenDFA}, seed=0)
+finally:
+    harness.oracle = harness_oracle
+if len(report.failures) != 1 or "bb" not in report.failures[0].word or not report.failures[0].expected:
+    raise Exception("harness", "slow oracle", report.failures)
+
+
+class ChunkReader:
+    """Stream reader stub that returns data by small chunks."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.reads = 0
+
+    async def read(self, n: int) -> bytes:
+        self.reads += 1
+        chunk, self.data = self.data[:n], self.data[n:]
+        return chunk
+
+
+def run(coroutine):
+    """Runs coroutine that never really suspends."""
+    try:
+        coroutine.send(None)
+    except StopIteration as result:
+        return result.value
+    raise Exception("coroutine suspended")
+
+
+machine = DFA.from_ndfa(translate(ast.parse("ab*"))).minimize()
+if not run(match_stream(machine, ChunkReader(b"a" + b"b" * 100), chunk_size=7)):
+    raise Exception("match_stream", "accept")
+reader = ChunkReader(b"ac" + b"b" * 100)
+if run(match_stream(machine, reader, chunk_size=7)) or reader.reads != 1:
+    raise Exception("match_stream", "early reject", reader.reads)
+
 if passed:
     print("\nAll tests passed.")
@@ -1,3 +1,4 @@
 from .translator import *
+from .program import *
 
 __all_ = ["translator"]
@@ -0,0 +1,83 @@
+from typing import List
+
+from ast import Node, AST
+from automaton.pike import SPLIT, JUMP, SAVE, MATCH, LOOP, Program, char
+
+__all__ = ["translate_program"]
+
+
+def count_groups(node: Node) -> int:
+    """Returns the biggest number of capturing group of the subtree."""
+    if node is None:
+        return 0
+    biggest = node.number if node.value() == '(' and len(node.children()) == 1 else 0
+    for child in node.children():
+        biggest = max(biggest, count_groups(child))
+    return biggest
+
+
+def program_node(node: Node, next_pc: int, instructions: List[tuple]) -> int:
+    """
+    Appends instructions of the subtree that continue by next_pc
+    and returns its first instruction. Alternatives that are written
+    first and greedy repetitions are preferred, as in `re`.
+    """
+    children: tuple = node.children()
+    if len(children) == 0:
+        instructions.append(char(node.ranges(), next_pc))
+        return len(instructions) - 1
+    elif node.value() == '+':
+        right = program_node(children[1], next_pc, instructions)
+        return program_node(children[0], right, instructions)
+    elif node.value() == '|':
+        left = program_node(children[0], next_pc, instructions)
+        right = program_node(children[1], next_pc, instructions)
+        instructions.append((SPLIT, left, right))
+        return len(instructions) - 1
+    elif node.value() == '*':
+        return loop(children[0], next_pc, instructions)
+    elif node.value() == '(':
+        instructions.append((SAVE, 2 * node.number + 1, next_pc))
+        body = program_node(children[0], len(instructions) - 1, instructions)
+        instructions.append((SAVE, 2 * node.number, body))
+        return len(instructions) - 1
+    elif node.value() == '{':
+        low, high = node.bounds()
+        if high is None:
+            pc = loop(children[0], next_pc, instructions)
+        else:
+            # Optional copies are nested: x{0,2} is (x(x)?)?,
+            # they are iterations of the repetition with the key of the last copy.
+            pc = next_pc
+            key = -1
+            for _ in range(high - low):
+                body = program_node(children[0], pc, instructions)
+                last = key < 0
+                key = len(instructions) if last else key
+                instructions.append((LOOP, body, next_pc, key, last))
+                pc = len(instructions) - 1
+        for _ in range(low):
+            pc = program_node(children[0], pc, instructions)
+        return pc
+    raise Exception("Unexpected operation: {}.".format(node.value()))
+
+
+def loop(node: Node, next_pc: int, instructions: List[tuple]) -> int:
+    """Appends greedy closure of the subtree and returns its first instruction."""
+    instructions.append((JUMP, next_pc))
+    split = len(instructions) - 1
+    body = program_node(node, split, instructions)
+    instructions[split] = (LOOP, body, next_pc, split, False)
+    return split
+
+
+def translate_program(ast: AST) -> Program:
+    """
+    Translate AST (parsed with groups) to the program of `automaton.PikeVM`
+    that matches words and returns spans of capturing groups.
+    """
+    instructions: List[tuple] = [(MATCH,)]
+    if ast.root() is None:
+        return Program(instructions, 0, 0)
+    start = program_node(ast.root(), 0, instructions)
+    return Program(instructions, start, count_groups(ast.root()))
@@ -1,5 +1,5 @@
 from ast import Node, AST
-from automaton import NDFA
+from automaton import NDFA, to_utf8
 from automaton.ndfa import NonDetTransitions
 
 
@@ -13,12 +13,19 @@ def translate_node(node: Node) -> NDFA:
 
     child_amount: int = len(children)
     if child_amount == 0:
-        return NDFA.by_value(node.value())
+        return NDFA.by_ranges(node.ranges())
     elif child_amount == 1:
         if node.value() == '*':
             return NDFA.by_closure(translate_node(children[0]))
+        elif node.value() == '(':
+            # Capturing group matches the same words as its subexpression.
+            return translate_node(children[0])
+        elif node.value() == '{':
+            # The subtree is translated once, its automaton is copied for every repetition.
+            low, high = node.bounds()
+            return NDFA.by_repetition(translate_node(children[0]), low, high)
         else:
-            raise Exception("Only clini operation has one argument.")
+            raise Exception("Only clini, repetition and group operations have one argument.")
 
     elif child_amount == 2:
         if node.value() == '|':
@@ -31,9 +38,16 @@ def translate_node(node: Node) -> NDFA:
         raise Exception("Too much arguments, only 1 and 2-ary operations are allowed.")
 
 
-def translate(ast: AST) -> NDFA:
-    """Translate AST to non-deterministic finite automaton."""
+def translate(ast: AST, utf8: bool = False) -> NDFA:
+    """
+    Translate AST to non-deterministic finite automaton.
+    If utf8 is set, the automaton matches UTF-8 encoded bytes instead of strings.
+    """
 
     if ast.root() is None:
-        return NDFA({0}, {0}, NonDetTransitions())
-    return translate_node(ast.root())
+        nd = NDFA({0}, {0}, NonDetTransitions())
+    else:
+        nd = translate_node(ast.root())
+    if utf8:
+        return to_utf8(nd)
+    return nd
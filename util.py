@@ -1,7 +1,72 @@
+from typing import Iterable, List, Optional, Tuple, Union
+
+import ast
+from automaton import DFA, NDFA, PikeVM, ApproximateMatcher, equivalence
+from tranlator import translate, translate_program
+
+# Regular expression or automaton built from it.
+Pattern = Union[str, NDFA, DFA]
+
+
 def verify_expression(a, w: str) -> bool:
-    """Checks whether word s satisfy automaton a"""
-    a.reset()
-    for symb in w:
-        if not a.put(symb):
-            return False
-    return a.in_final_state()
+    """
+    Checks whether word s satisfy automaton a.
+    The automaton is not changed, so it can be shared between threads.
+    """
+    return a.fullmatch(w)
+
+
+def capturing(regexp: str) -> PikeVM:
+    """
+    Returns machine of regular expression where parenthesis are capturing groups,
+    its `fullmatch(w)` returns spans of the groups (see `automaton.PikeVM`).
+    """
+    return PikeVM(translate_program(ast.parse(regexp, groups=True)))
+
+
+def approximate(p: Pattern, k: int) -> ApproximateMatcher:
+    """
+    Returns matcher of words within k edits of the pattern,
+    its `distance(w)` returns the minimal amount of edits (see `automaton.ApproximateMatcher`).
+    """
+    a = automaton_of(p)
+    if isinstance(a, DFA):
+        a = NDFA.from_dfa(a)
+    return ApproximateMatcher(a, k)
+
+
+def automaton_of(p: Pattern):
+    """Returns automaton of regular expression or the automaton itself."""
+    if isinstance(p, str):
+        return translate(ast.parse(p))
+    return p
+
+
+def equivalent(p1: Pattern, p2: Pattern) -> Tuple[bool, Optional[str]]:
+    """Checks whether two patterns define the same language, see `automaton.equivalent`."""
+    return equivalence.equivalent(automaton_of(p1), automaton_of(p2))
+
+
+def includes(p1: Pattern, p2: Pattern) -> Tuple[bool, Optional[str]]:
+    """Checks whether language of p1 includes language of p2, see `automaton.includes`."""
+    return equivalence.includes(automaton_of(p1), automaton_of(p2))
+
+
+def fingerprint(p: Pattern) -> str:
+    """Returns hash of the language of the pattern, see `automaton.fingerprint`."""
+    a = automaton_of(p)
+    if isinstance(a, NDFA):
+        a = DFA.from_ndfa(a)
+    return equivalence.fingerprint(a)
+
+
+def deduplicate(patterns: Iterable[Pattern]) -> List[Pattern]:
+    """Returns the first pattern of every language."""
+    seen = set()
+    unique: List[Pattern] = []
+    for p in patterns:
+        key = fingerprint(p)
+        if key not in seen:
+            seen.add(key)
+            unique.append(p)
+    return unique